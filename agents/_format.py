@@ -0,0 +1,35 @@
+"""
+Shared formatting of Persian verses for the agent prompt builders.
+Each helper returns one line (or block) per beyt, every one newline-terminated.
+
+Verse tuples are hashable, so the rendered blocks are memoized: the four
+passes (and any re-run of a pass) format the same ghazal's verses again.
+"""
+
+import functools
+
+from agents.models import Verse
+
+# Enough for every ghazal of a typical run, in all three formats
+_CACHE_SIZE = 512
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def format_verses_numbered(verses: tuple[Verse, ...]) -> str:
+    """`Verse N:` followed by each hemistich on its own indented line."""
+    return "".join([f"Verse {i}:\n  {v.hemistich1}\n  {v.hemistich2}\n"
+                    for i, v in enumerate(verses, 1)])
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def format_verses_inline(verses: tuple[Verse, ...]) -> str:
+    """`Verse N: hemistich1 / hemistich2`, one beyt per line."""
+    return "".join([f"Verse {i}: {v.hemistich1} / {v.hemistich2}\n"
+                    for i, v in enumerate(verses, 1)])
+
+
+@functools.lru_cache(maxsize=_CACHE_SIZE)
+def format_verses_list(verses: tuple[Verse, ...]) -> str:
+    """`N. hemistich1 / hemistich2`, one beyt per line."""
+    return "".join([f"{i}. {v.hemistich1} / {v.hemistich2}\n"
+                    for i, v in enumerate(verses, 1)])
@@ -3,6 +3,11 @@ Pass 1: Analyzer Agent
 Deeply analyzes Persian text before translation.
 """
 
+import functools
+
+from agents.models import Ghazal
+from agents._format import format_verses_numbered
+
 ANALYZER_SYSTEM_PROMPT = """You are a scholarly analyst of classical Persian Sufi poetry, specializing in Rumi's Divan-e Kabir. Your task is to analyze Persian ghazals to prepare them for translation.
 
 ## Your Analysis Must Include:
@@ -77,27 +82,43 @@ Respond with a JSON object (no markdown code blocks, just raw JSON):
 }
 """
 
-def get_analyzer_prompt(ghazal: dict) -> str:
-    """Generate the user prompt for analysis."""
-    verses_text = []
-    for i, verse in enumerate(ghazal["verses"], 1):
-        verses_text.append(f"Verse {i}:")
-        verses_text.append(f"  {verse['hemistich1']}")
-        verses_text.append(f"  {verse['hemistich2']}")
-
-    persian_text = "\n".join(verses_text)
+@functools.lru_cache(maxsize=512)
+def get_analyzer_prompt(ghazal: Ghazal) -> str:
+    """Generate the user prompt for analysis (memoized; Ghazal is frozen and hashable)."""
+    buf = [
+        "Analyze the following ghazal from Rumi's Divan-e Kabir.\n\n",
+        f"**Ghazal Number**: {ghazal.number}\n",
+        f"**Meter**: {ghazal.meter or 'Unknown'}\n",
+        f"**Rhyme**: {ghazal.rhyme or 'Unknown'}\n\n",
+        "**Persian Text**:\n",
+    ]
+    buf.append(format_verses_numbered(ghazal.verses))
+    buf.append("""
+Provide a detailed analysis as JSON. Remember:
+- Identify ALL Quranic allusions and hadith references
+- Flag ambiguities that should be PRESERVED, not resolved
+- Note wordplay even if it cannot be translated
+- Be specific about Sufi terminology""")
 
-    return f"""Analyze the following ghazal from Rumi's Divan-e Kabir.
+    return "".join(buf)
 
-**Ghazal Number**: {ghazal.get('number', 'Unknown')}
-**Meter**: {ghazal.get('meter', 'Unknown')}
-**Rhyme**: {ghazal.get('rhyme', 'Unknown')}
 
-**Persian Text**:
-{persian_text}
+def get_analyzer_batch_prompt(ghazals: list[Ghazal]) -> str:
+    """Generate one user prompt that asks for analyses of several ghazals."""
+    buf = [f"Analyze each of the following {len(ghazals)} ghazals from Rumi's Divan-e Kabir independently.\n"]
+    for k, ghazal in enumerate(ghazals, 1):
+        buf.append(f"\n## Ghazal {k}\n\n")
+        buf.append(f"**Ghazal Number**: {ghazal.number}\n")
+        buf.append(f"**Meter**: {ghazal.meter or 'Unknown'}\n")
+        buf.append(f"**Rhyme**: {ghazal.rhyme or 'Unknown'}\n\n")
+        buf.append("**Persian Text**:\n")
+        buf.append(format_verses_numbered(ghazal.verses))
 
-Provide a detailed analysis as JSON. Remember:
+    buf.append(f"""
+Respond with a single JSON object of the form {{"analyses": [...]}}, where the array holds exactly {len(ghazals)} analyses in the order given above, each in the output format described in your instructions. Remember:
 - Identify ALL Quranic allusions and hadith references
 - Flag ambiguities that should be PRESERVED, not resolved
 - Note wordplay even if it cannot be translated
-- Be specific about Sufi terminology"""
+- Be specific about Sufi terminology""")
+
+    return "".join(buf)
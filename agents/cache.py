@@ -0,0 +1,172 @@
+"""
+Persistent caches for agent outputs.
+Each pass is a pure function of (model, system prompt, user prompt), so a
+re-run over the same ghazals can skip the LLM entirely. SemanticCache goes
+further for the Analyzer, reusing analyses across near-duplicate ghazals.
+"""
+
+import functools
+import hashlib
+import orjson
+import os
+import sqlite3
+
+DEFAULT_CACHE_PATH = ".agent_cache.sqlite"
+DEFAULT_SEMANTIC_CACHE_DIR = ".semantic_cache"
+DEFAULT_EMBEDDING_MODEL = "intfloat/multilingual-e5-small"
+
+# Overrides DEFAULT_CACHE_PATH, e.g. to share one cache across checkouts
+CACHE_PATH_ENV = "DIVAN_CACHE"
+
+
+@functools.lru_cache(maxsize=16)
+def _prefix_digest(model: str, system_prompt: str):
+    """
+    SHA-256 state after hashing the model and system prompt.
+
+    There are only four static system prompts, so each is encoded and hashed
+    once per process; make_key copies the state and feeds only the user prompt.
+    """
+    return hashlib.sha256(f"{model}\0{system_prompt}\0".encode("utf-8"))
+
+
+class AgentCache:
+    """SQLite store of parsed agent responses, keyed by a SHA-256 of the request."""
+
+    def __init__(self, path: str | None = None):
+        path = path or os.environ.get(CACHE_PATH_ENV) or DEFAULT_CACHE_PATH
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS agent_cache (key TEXT PRIMARY KEY, response TEXT NOT NULL)"
+        )
+        self.conn.commit()
+
+    @staticmethod
+    def make_key(model: str, system_prompt: str, user_prompt: str) -> str:
+        """Hash the full request; NUL separators keep field boundaries unambiguous."""
+        digest = _prefix_digest(model, system_prompt).copy()
+        digest.update(user_prompt.encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT response FROM agent_cache WHERE key = ?", (key,)
+        ).fetchone()
+        return orjson.loads(row[0]) if row else None
+
+    def set(self, key: str, response: dict):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO agent_cache (key, response) VALUES (?, ?)",
+            (key, orjson.dumps(response).decode("utf-8"))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class NullCache(AgentCache):
+    """An AgentCache that stores nothing, for runs that must hit the API (--no-cache)."""
+
+    def __init__(self):
+        self.path = None
+
+    def get(self, key: str) -> dict | None:
+        return None
+
+    def set(self, key: str, response: dict):
+        pass
+
+    def close(self):
+        pass
+
+
+class SemanticCache:
+    """
+    Nearest-neighbour cache over embeddings of the Persian text.
+
+    Requires the optional sentence-transformers and faiss-cpu packages.
+    Embeddings are L2-normalized, so inner product is cosine similarity.
+    """
+
+    def __init__(self, path: str = DEFAULT_SEMANTIC_CACHE_DIR,
+                 model_name: str = DEFAULT_EMBEDDING_MODEL, threshold: float = 0.95):
+        try:
+            import faiss
+            from sentence_transformers import SentenceTransformer
+        except ImportError as e:
+            raise ImportError(
+                "SemanticCache needs sentence-transformers and faiss-cpu: "
+                "pip install sentence-transformers faiss-cpu"
+            ) from e
+
+        self._faiss = faiss
+        self._pending = {}  # text -> vector, filled by prime()
+        self.path = path
+        self.threshold = threshold
+        self.model = SentenceTransformer(model_name)
+
+        index_file = os.path.join(path, "index.faiss")
+        entries_file = os.path.join(path, "entries.json")
+        if os.path.exists(index_file) and os.path.exists(entries_file):
+            self.index = faiss.read_index(index_file)
+            with open(entries_file, 'rb') as f:
+                self.entries = orjson.loads(f.read())
+        else:
+            self.index = faiss.IndexFlatIP(self.model.get_sentence_embedding_dimension())
+            self.entries = []
+
+    def embed(self, texts: list[str], batch_size: int = 32):
+        """Embed texts as a float32 matrix of unit vectors."""
+        # E5 models expect a role prefix; "query: " is the symmetric-similarity one
+        return self.model.encode(
+            [f"query: {t}" for t in texts],
+            batch_size=batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True
+        ).astype("float32")
+
+    def prime(self, texts: list[str], batch_size: int = 32):
+        """
+        Embed many texts up front in batched encode calls.
+
+        Later lookup()/add() calls for these texts reuse the stored vectors
+        instead of embedding one text at a time.
+        """
+        texts = [t for t in dict.fromkeys(texts) if t not in self._pending]
+        if texts:
+            self._pending.update(zip(texts, self.embed(texts, batch_size)))
+
+    def _vectors(self, text: str):
+        """A 1×dim matrix for text, from prime() if it was embedded there."""
+        vector = self._pending.get(text)
+        if vector is None:
+            return self.embed([text])
+        return vector.reshape(1, -1)
+
+    def lookup(self, text: str) -> dict | None:
+        """Return the cached value for the most similar text, if close enough."""
+        if not self.entries:
+            return None
+        scores, ids = self.index.search(self._vectors(text), 1)
+        if scores[0][0] >= self.threshold:
+            return self.entries[ids[0][0]]
+        return None
+
+    def add(self, text: str, value: dict):
+        self.index.add(self._vectors(text))
+        self.entries.append(value)
+        self._pending.pop(text, None)
+
+    def add_many(self, texts: list[str], values: list[dict], batch_size: int = 32):
+        """Bulk-insert (text, value) pairs with a single batched embedding pass."""
+        if texts:
+            self.index.add(self.embed(texts, batch_size))
+            self.entries.extend(values)
+
+    def save(self):
+        os.makedirs(self.path, exist_ok=True)
+        self._faiss.write_index(self.index, os.path.join(self.path, "index.faiss"))
+        with open(os.path.join(self.path, "entries.json"), 'wb') as f:
+            f.write(orjson.dumps(self.entries))
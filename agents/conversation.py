@@ -0,0 +1,65 @@
+"""
+All four passes as turns of one conversation.
+The Persian text and each pass's output are sent once; later turns refer
+back to them instead of re-sending them inside a fresh prompt.
+"""
+
+from agents.models import Ghazal
+from agents.analyzer import ANALYZER_SYSTEM_PROMPT, get_analyzer_prompt
+from agents.translator import TRANSLATOR_SYSTEM_PROMPT
+from agents.stylist import STYLIST_SYSTEM_PROMPT
+from agents.qa import QA_SYSTEM_PROMPT
+
+CONVERSATION_SYSTEM_PROMPT = f"""You will work on one ghazal from Rumi's Divan-e Kabir in four successive roles. Each user turn names the role to take. Follow that role's instructions below, and build on your own earlier answers in this conversation.
+
+# Role: Analyzer
+
+{ANALYZER_SYSTEM_PROMPT}
+
+# Role: Translator
+
+{TRANSLATOR_SYSTEM_PROMPT}
+
+# Role: Stylist
+
+{STYLIST_SYSTEM_PROMPT}
+
+# Role: QA
+
+{QA_SYSTEM_PROMPT}"""
+
+TRANSLATOR_TURN = """**Role**: Translator
+
+Translate the ghazal above, using your analysis as context. Produce an accurate, literal translation. Use the glossary consistently. Mark uncertainties with [?]. Preserve Islamic context (Hajj, Kaaba, prayer postures). Output as JSON."""
+
+STYLIST_TURN = """**Role**: Stylist
+
+Refine your literal translation above into poetry that sounds like Rumi.
+
+Transform it into Rumi's voice:
+- Direct address and urgency
+- Embodied, passionate language
+- Contemporary (not Victorian) English
+- Preserve ALL Islamic context (Hajj, Kaaba, prayer, etc.)
+- Don't soften or over-explain
+
+Output as JSON with the refined translation."""
+
+QA_TURN = """**Role**: QA
+
+Review the refined translation above against the Persian, your analysis and the literal translation.
+
+Check for:
+1. Semantic fidelity (does English match Persian meaning?)
+2. No hallucinations (nothing added that wasn't there?)
+3. Islamic context preserved (Hajj, Kaaba, prayer intact?)
+4. Terminology consistent with glossary?
+5. Tone sounds like Rumi (urgent, embodied, not academic)?
+6. Ambiguities preserved (not over-explained)?
+
+Output your QA assessment as JSON."""
+
+
+def get_conversation_opening(ghazal: Ghazal) -> str:
+    """The first user turn: the ghazal itself, for the Analyzer."""
+    return "**Role**: Analyzer\n\n" + get_analyzer_prompt(ghazal)
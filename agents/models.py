@@ -0,0 +1,46 @@
+"""
+Typed ghazal payloads shared by the agent prompt builders.
+Slotted, frozen dataclasses: cheaper than per-verse dicts and hashable.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True, frozen=True)
+class Verse:
+    """One beyt (couplet): two hemistichs."""
+    hemistich1: str
+    hemistich2: str
+
+    @classmethod
+    def from_dict(cls, verse: dict) -> "Verse":
+        return cls(verse.get("hemistich1", ""), verse.get("hemistich2", ""))
+
+    def to_dict(self) -> dict:
+        return {"hemistich1": self.hemistich1, "hemistich2": self.hemistich2}
+
+
+@dataclass(slots=True, frozen=True)
+class Ghazal:
+    """A source ghazal as read from a corpus file (see sample_ghazals.json)."""
+    number: int
+    verses: tuple[Verse, ...]
+    meter: str = ""
+    rhyme: str = ""
+    title: str = ""
+    notes: str = ""
+
+    @classmethod
+    def from_dict(cls, ghazal: dict) -> "Ghazal":
+        return cls(
+            number=ghazal.get("number", 0),
+            verses=tuple(Verse.from_dict(v) for v in ghazal["verses"]),
+            meter=ghazal.get("meter", ""),
+            rhyme=ghazal.get("rhyme", ""),
+            title=ghazal.get("title", ""),
+            notes=ghazal.get("notes", ""),
+        )
+
+    def persian_text(self) -> str:
+        """The verses as plain text, one beyt per line."""
+        return "\n".join(f"{v.hemistich1} / {v.hemistich2}" for v in self.verses)
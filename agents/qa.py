@@ -3,6 +3,9 @@ Pass 4: QA Agent
 Quality assurance check before final output.
 """
 
+from agents.models import Ghazal
+from agents._format import format_verses_list
+
 QA_SYSTEM_PROMPT = """You are a quality assurance reviewer for translations of Rumi's Divan-e Kabir. Your task is to catch errors before publication.
 
 ## Your Checks:
@@ -80,57 +83,45 @@ Respond with a JSON object (no markdown code blocks, just raw JSON):
 }
 """
 
-def get_qa_prompt(ghazal: dict, analysis: dict, literal_translation: dict, refined_translation: dict) -> str:
+def get_qa_prompt(ghazal: Ghazal, analysis: dict, literal_translation: dict, refined_translation: dict) -> str:
     """Generate the user prompt for QA review."""
+    buf = [
+        "Review this translation for quality assurance.\n\n",
+        f"**Ghazal Number**: {ghazal.number}\n\n",
+        "**Original Persian**:\n",
+    ]
 
     # Original Persian
-    persian_verses = []
-    for i, verse in enumerate(ghazal["verses"], 1):
-        persian_verses.append(f"{i}. {verse['hemistich1']} / {verse['hemistich2']}")
-    persian_text = "\n".join(persian_verses)
+    buf.append(format_verses_list(ghazal.verses))
 
     # Literal translation
-    literal_verses = []
-    for v in literal_translation.get("verses", []):
-        literal_verses.append(f"{v['verse_number']}. {v['hemistich1']} / {v['hemistich2']}")
-    literal_text = "\n".join(literal_verses)
+    buf.append("\n**Literal Translation**:\n")
+    buf.extend(f"{v['verse_number']}. {v['hemistich1']} / {v['hemistich2']}\n"
+               for v in literal_translation.get("verses", []))
 
     # Refined translation
+    buf.append("\n**Refined Translation** (to review):\n")
     refined_text = refined_translation.get("full_text", "")
-    if not refined_text:
-        refined_verses = []
-        for v in refined_translation.get("verses", []):
-            refined_verses.append(f"{v['verse_number']}. {v['line1']} / {v['line2']}")
-        refined_text = "\n".join(refined_verses)
+    if refined_text:
+        buf.append(f"{refined_text}\n")
+    else:
+        buf.extend(f"{v['verse_number']}. {v['line1']} / {v['line2']}\n"
+                   for v in refined_translation.get("verses", []))
 
     # Key analysis points for verification
-    analysis_points = []
+    buf.append("\n**Analysis Summary**:\n")
+    summary_start = len(buf)
     if analysis.get("quranic_allusions"):
-        analysis_points.append(f"Quranic allusions: {len(analysis['quranic_allusions'])} identified")
+        buf.append(f"Quranic allusions: {len(analysis['quranic_allusions'])} identified\n")
     if analysis.get("sufi_terminology"):
         terms = [t['term'] for t in analysis['sufi_terminology']]
-        analysis_points.append(f"Sufi terms: {', '.join(terms)}")
+        buf.append(f"Sufi terms: {', '.join(terms)}\n")
     if analysis.get("ambiguities"):
-        analysis_points.append(f"Ambiguities: {len(analysis['ambiguities'])} to preserve")
-
-    analysis_summary = "\n".join(analysis_points) if analysis_points else "Standard ghazal"
-
-    return f"""Review this translation for quality assurance.
-
-**Ghazal Number**: {ghazal.get('number', 'Unknown')}
-
-**Original Persian**:
-{persian_text}
-
-**Literal Translation**:
-{literal_text}
-
-**Refined Translation** (to review):
-{refined_text}
-
-**Analysis Summary**:
-{analysis_summary}
+        buf.append(f"Ambiguities: {len(analysis['ambiguities'])} to preserve\n")
+    if len(buf) == summary_start:
+        buf.append("Standard ghazal\n")
 
+    buf.append("""
 Check for:
 1. Semantic fidelity (does English match Persian meaning?)
 2. No hallucinations (nothing added that wasn't there?)
@@ -139,4 +130,6 @@ Check for:
 5. Tone sounds like Rumi (urgent, embodied, not academic)?
 6. Ambiguities preserved (not over-explained)?
 
-Output your QA assessment as JSON."""
+Output your QA assessment as JSON.""")
+
+    return "".join(buf)
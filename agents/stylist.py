@@ -3,6 +3,9 @@ Pass 3: Stylist Agent
 Refines literal translation into Rumi's voice.
 """
 
+from agents.models import Ghazal
+from agents._format import format_verses_inline
+
 STYLIST_SYSTEM_PROMPT = """You are a poet refining translations of Rumi's Divan-e Kabir. Your task is to transform accurate but plain translations into poetry that sounds like Rumi in English.
 
 ## Rumi's Voice
@@ -63,7 +66,8 @@ Respond with a JSON object (no markdown code blocks, just raw JSON):
         "line2": "Poetic English..."
       }
     ],
-    "full_text": "Complete poem as flowing text..."
+    "full_text": "Complete poem as flowing text...",
+    "self_confidence": "high|medium|low"
   },
   "stylistic_choices": [
     {"verse": 1, "choice": "...", "rationale": "..."}
@@ -71,48 +75,37 @@ Respond with a JSON object (no markdown code blocks, just raw JSON):
   "preserved_elements": ["list of Islamic/Sufi elements kept"],
   "tone_notes": "Brief note on the overall tone achieved"
 }
+
+Set "self_confidence" to "high" only if every verse is translated, no meaning is in doubt, and nothing needed softening or omitting.
 """
 
-def get_stylist_prompt(ghazal: dict, analysis: dict, literal_translation: dict) -> str:
+def get_stylist_prompt(ghazal: Ghazal, analysis: dict, literal_translation: dict) -> str:
     """Generate the user prompt for stylistic refinement."""
+    buf = [
+        "Refine this literal translation into poetry that sounds like Rumi.\n\n",
+        f"**Ghazal Number**: {ghazal.number}\n\n",
+        "**Original Persian** (for reference):\n",
+    ]
 
-    # Format the literal translation
-    literal_verses = []
-    for v in literal_translation.get("verses", []):
-        literal_verses.append(f"Verse {v['verse_number']}:")
-        literal_verses.append(f"  {v['hemistich1']}")
-        literal_verses.append(f"  {v['hemistich2']}")
-
-    literal_text = "\n".join(literal_verses)
+    # Original Persian for reference
+    buf.append(format_verses_inline(ghazal.verses))
 
-    # Format original Persian for reference
-    persian_verses = []
-    for i, verse in enumerate(ghazal["verses"], 1):
-        persian_verses.append(f"Verse {i}: {verse['hemistich1']} / {verse['hemistich2']}")
-
-    persian_text = "\n".join(persian_verses)
+    # The literal translation
+    buf.append("\n**Literal Translation**:\n")
+    buf.extend(f"Verse {v['verse_number']}:\n  {v['hemistich1']}\n  {v['hemistich2']}\n"
+               for v in literal_translation.get("verses", []))
+    buf.append("\n")
 
     # Key analysis points
-    key_points = []
+    sep = "**Context**:\n"
     if analysis.get("ambiguities"):
-        key_points.append("**Ambiguities to preserve**: " +
+        buf.append(f"{sep}**Ambiguities to preserve**: " +
             ", ".join([a["phrase"] for a in analysis["ambiguities"]]))
+        sep = "\n"
     if analysis.get("key_images"):
-        key_points.append("**Key images**: " + ", ".join(analysis["key_images"]))
-
-    context = "\n".join(key_points) if key_points else ""
+        buf.append(f"{sep}**Key images**: " + ", ".join(analysis["key_images"]))
 
-    return f"""Refine this literal translation into poetry that sounds like Rumi.
-
-**Ghazal Number**: {ghazal.get('number', 'Unknown')}
-
-**Original Persian** (for reference):
-{persian_text}
-
-**Literal Translation**:
-{literal_text}
-
-{f"**Context**:" + chr(10) + context if context else ""}
+    buf.append("""
 
 Transform this into Rumi's voice:
 - Direct address and urgency
@@ -121,4 +114,6 @@ Transform this into Rumi's voice:
 - Preserve ALL Islamic context (Hajj, Kaaba, prayer, etc.)
 - Don't soften or over-explain
 
-Output as JSON with the refined translation."""
+Output as JSON with the refined translation.""")
+
+    return "".join(buf)
@@ -3,6 +3,9 @@ Pass 2: Translator Agent
 Produces accurate literal translation with analysis context.
 """
 
+from agents.models import Ghazal
+from agents._format import format_verses_numbered
+
 TRANSLATOR_SYSTEM_PROMPT = """You are a scholarly translator of classical Persian Sufi poetry. Your task is to produce an ACCURATE, LITERAL translation of Rumi's ghazals.
 
 ## Your Priority: ACCURACY
@@ -64,46 +67,45 @@ Respond with a JSON object (no markdown code blocks, just raw JSON):
 }
 """
 
-def get_translator_prompt(ghazal: dict, analysis: dict) -> str:
+def get_translator_prompt(ghazal: Ghazal, analysis: dict) -> str:
     """Generate the user prompt for translation."""
-    verses_text = []
-    for i, verse in enumerate(ghazal["verses"], 1):
-        verses_text.append(f"Verse {i}:")
-        verses_text.append(f"  {verse['hemistich1']}")
-        verses_text.append(f"  {verse['hemistich2']}")
-
-    persian_text = "\n".join(verses_text)
+    buf = [
+        "Translate the following ghazal from Rumi's Divan-e Kabir.\n\n",
+        f"**Ghazal Number**: {ghazal.number}\n",
+        f"**Meter**: {ghazal.meter or 'Unknown'}\n\n",
+        "**Persian Text**:\n",
+    ]
+    buf.append(format_verses_numbered(ghazal.verses))
+    buf.append("\n**Analysis Context**:\n")
 
-    # Format key analysis points for context
-    analysis_summary = []
+    # Format key analysis points for context; sections are blank-line separated
+    sep = ""
 
     if analysis.get("quranic_allusions"):
-        refs = [f"- {a['phrase']}: {a['reference']}" for a in analysis["quranic_allusions"]]
-        analysis_summary.append("**Quranic Allusions**:\n" + "\n".join(refs))
+        buf.append(f"{sep}**Quranic Allusions**:")
+        buf.extend(f"\n- {a['phrase']}: {a['reference']}" for a in analysis["quranic_allusions"])
+        sep = "\n\n"
 
     if analysis.get("sufi_terminology"):
-        terms = [f"- {t['term']}: {t['meaning_in_context']}" for t in analysis["sufi_terminology"]]
-        analysis_summary.append("**Sufi Terms**:\n" + "\n".join(terms))
+        buf.append(f"{sep}**Sufi Terms**:")
+        buf.extend(f"\n- {t['term']}: {t['meaning_in_context']}" for t in analysis["sufi_terminology"])
+        sep = "\n\n"
 
     if analysis.get("ambiguities"):
-        ambs = [f"- {a['phrase']}: {', '.join(a['possible_readings'])}" for a in analysis["ambiguities"]]
-        analysis_summary.append("**Ambiguities to Preserve**:\n" + "\n".join(ambs))
+        buf.append(f"{sep}**Ambiguities to Preserve**:")
+        buf.extend(f"\n- {a['phrase']}: {', '.join(a['possible_readings'])}" for a in analysis["ambiguities"])
+        sep = "\n\n"
 
     if analysis.get("wordplay"):
-        plays = [f"- {w['word']}: {', '.join(w['meanings'])}" for w in analysis["wordplay"]]
-        analysis_summary.append("**Wordplay**:\n" + "\n".join(plays))
-
-    analysis_text = "\n\n".join(analysis_summary) if analysis_summary else "No special notes."
-
-    return f"""Translate the following ghazal from Rumi's Divan-e Kabir.
+        buf.append(f"{sep}**Wordplay**:")
+        buf.extend(f"\n- {w['word']}: {', '.join(w['meanings'])}" for w in analysis["wordplay"])
+        sep = "\n\n"
 
-**Ghazal Number**: {ghazal.get('number', 'Unknown')}
-**Meter**: {ghazal.get('meter', 'Unknown')}
+    if not sep:
+        buf.append("No special notes.")
 
-**Persian Text**:
-{persian_text}
+    buf.append("""
 
-**Analysis Context**:
-{analysis_text}
+Produce an accurate, literal translation. Use the glossary consistently. Mark uncertainties with [?]. Preserve Islamic context (Hajj, Kaaba, prayer postures). Output as JSON.""")
 
-Produce an accurate, literal translation. Use the glossary consistently. Mark uncertainties with [?]. Preserve Islamic context (Hajj, Kaaba, prayer postures). Output as JSON."""
+    return "".join(buf)
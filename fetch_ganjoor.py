@@ -7,115 +7,213 @@ Usage:
     python fetch_ganjoor.py --start 1 --count 5 --output real_ghazals.json
 """
 
-import requests
-import json
-import re
-import time
+import aiohttp
+import asyncio
 import argparse
+import orjson
+from concurrent.futures import ProcessPoolExecutor
+from aiolimiter import AsyncLimiter
 from bs4 import BeautifulSoup
 
 BASE_URL = "https://ganjoor.net/moulavi/shams/ghazalsh/sh"
+WARMUP_URL = "https://ganjoor.net/"
+
+# Maximum number of requests in flight against ganjoor.net at once
+DEFAULT_CONCURRENCY = 5
+
+# Sustained request budget (token bucket), independent of concurrency
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+# Ganjoor's HTML compresses well; only advertise brotli when aiohttp can decode it
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+HEADERS = {
+    "Accept-Encoding": _ACCEPT_ENCODING,
+    "User-Agent": "DivanTranslationProject/1.0",
+}
+
+# Retry policy for transient failures (rate limiting, gateway errors)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def _retry_delay(response: aiohttp.ClientResponse, attempt: int) -> float:
+    """Honour a numeric Retry-After header, else back off exponentially."""
+    retry_after = response.headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * 2 ** attempt
+
+
+async def _get_html(session: aiohttp.ClientSession, url: str,
+                    limiter: AsyncLimiter | None = None) -> tuple[bytes, str]:
+    """GET a page, retrying transient errors with exponential backoff."""
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            # Every attempt, retries included, spends a token from the bucket
+            if limiter is not None:
+                await limiter.acquire()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
+                if response.status in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    await asyncio.sleep(_retry_delay(response, attempt))
+                    continue
+                response.raise_for_status()
+                html = await response.read()
+                # Ganjoor serves UTF-8; only trust another charset if the header says so
+                return html, response.charset or 'utf-8'
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_RETRIES:
+                raise
+            await asyncio.sleep(BACKOFF_FACTOR * 2 ** attempt)
+
+
+def parse_ghazal_html(html: bytes, ghazal_num: int, url: str,
+                      encoding: str = 'utf-8') -> dict | None:
+    """Extract a ghazal from a Ganjoor page (no I/O, so it can run in a worker process)."""
+    # lxml parses the raw bytes in C, skipping a separate decode step
+    soup = BeautifulSoup(html, 'lxml', from_encoding=encoding)
+
+    # Find the poem content
+    # Ganjoor uses specific classes for poem content
+    poem_div = soup.find('div', class_='b')
+    if not poem_div:
+        # Try alternative selectors
+        poem_div = soup.find('div', class_='poem-content')
+    if not poem_div:
+        poem_div = soup.find('article')
+
+    if not poem_div:
+        print(f"  Could not find poem content for ghazal {ghazal_num}")
+        return None
+
+    # Extract verses
+    # Ganjoor typically has verses in <p> tags with class 'm1' and 'm2' for hemistichs
+    verses = []
+
+    # One walk over the subtree; hemistichs alternate m1, m2 in document
+    # order, so consecutive tags form each beyt
+    verse_tags = poem_div.select('p.m1, p.m2')
+
+    if verse_tags:
+        hemistichs = iter([p.get_text(strip=True) for p in verse_tags])
+        for h1, h2 in zip(hemistichs, hemistichs):
+            verses.append({
+                "hemistich1": h1,
+                "hemistich2": h2
+            })
+    else:
+        # Last resort: get all text and try to parse
+        all_text = poem_div.get_text(separator='\n', strip=True)
+        lines = [l.strip() for l in all_text.split('\n') if l.strip()]
+        for i in range(0, len(lines), 2):
+            if i + 1 < len(lines):
+                verses.append({
+                    "hemistich1": lines[i],
+                    "hemistich2": lines[i + 1]
+                })
+
+    if not verses:
+        print(f"  Could not extract verses for ghazal {ghazal_num}")
+        return None
+
+    # Try to get the title
+    title_tag = soup.find('h1')
+    title = title_tag.get_text(strip=True) if title_tag else f"غزل شماره {ghazal_num}"
+
+    return {
+        "number": ghazal_num,
+        "ganjoor_url": url,
+        "title": title,
+        "meter": "",  # Would need additional parsing
+        "rhyme": "",  # Would need additional parsing
+        "verses": verses,
+        "notes": ""
+    }
+
+
+async def fetch_ghazal(session: aiohttp.ClientSession, ghazal_num: int,
+                       limiter: AsyncLimiter | None = None,
+                       pool: ProcessPoolExecutor | None = None) -> dict | None:
+    """
+    Fetch a single ghazal from Ganjoor website.
 
-def fetch_ghazal(ghazal_num: int) -> dict | None:
-    """Fetch a single ghazal from Ganjoor website."""
+    With a pool, parsing runs in a worker process so the CPU-bound tree
+    walk doesn't stall other downloads on the event loop.
+    """
     url = f"{BASE_URL}{ghazal_num}/"
 
     try:
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        response.encoding = 'utf-8'
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Find the poem content
-        # Ganjoor uses specific classes for poem content
-        poem_div = soup.find('div', class_='b')
-        if not poem_div:
-            # Try alternative selectors
-            poem_div = soup.find('div', class_='poem-content')
-        if not poem_div:
-            poem_div = soup.find('article')
-
-        if not poem_div:
-            print(f"  Could not find poem content for ghazal {ghazal_num}")
-            return None
-
-        # Extract verses
-        # Ganjoor typically has verses in <p> tags with class 'm1' and 'm2' for hemistichs
-        verses = []
-
-        # Try to find verse pairs
-        m1_tags = poem_div.find_all('p', class_='m1')  # First hemistich
-        m2_tags = poem_div.find_all('p', class_='m2')  # Second hemistich
-
-        if m1_tags and m2_tags:
-            for m1, m2 in zip(m1_tags, m2_tags):
-                verses.append({
-                    "hemistich1": m1.get_text(strip=True),
-                    "hemistich2": m2.get_text(strip=True)
-                })
-        else:
-            # Alternative: look for all verse lines
-            verse_tags = poem_div.find_all('p', class_=re.compile(r'm\d'))
-            if verse_tags:
-                for i in range(0, len(verse_tags), 2):
-                    if i + 1 < len(verse_tags):
-                        verses.append({
-                            "hemistich1": verse_tags[i].get_text(strip=True),
-                            "hemistich2": verse_tags[i + 1].get_text(strip=True)
-                        })
-            else:
-                # Last resort: get all text and try to parse
-                all_text = poem_div.get_text(separator='\n', strip=True)
-                lines = [l.strip() for l in all_text.split('\n') if l.strip()]
-                for i in range(0, len(lines), 2):
-                    if i + 1 < len(lines):
-                        verses.append({
-                            "hemistich1": lines[i],
-                            "hemistich2": lines[i + 1]
-                        })
-
-        if not verses:
-            print(f"  Could not extract verses for ghazal {ghazal_num}")
-            return None
-
-        # Try to get the title
-        title_tag = soup.find('h1')
-        title = title_tag.get_text(strip=True) if title_tag else f"غزل شماره {ghazal_num}"
-
-        return {
-            "number": ghazal_num,
-            "ganjoor_url": url,
-            "title": title,
-            "meter": "",  # Would need additional parsing
-            "rhyme": "",  # Would need additional parsing
-            "verses": verses,
-            "notes": ""
-        }
-
-    except requests.RequestException as e:
+        html, encoding = await _get_html(session, url, limiter)
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"  Error fetching ghazal {ghazal_num}: {e}")
         return None
 
+    if pool is None:
+        return parse_ghazal_html(html, ghazal_num, url, encoding)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(pool, parse_ghazal_html, html, ghazal_num, url, encoding)
+
+
+async def _warm_up(session: aiohttp.ClientSession):
+    """
+    Resolve DNS and open one keep-alive connection before the first burst,
+    so the concurrent fetches don't all stall on the same cold handshake.
+    """
+    try:
+        async with session.head(WARMUP_URL, timeout=aiohttp.ClientTimeout(total=10)):
+            pass
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        # Only an optimization; the real requests retry and report errors
+        pass
 
-def fetch_ghazals(start: int, count: int, delay: float = 1.0) -> list:
-    """Fetch multiple ghazals."""
-    ghazals = []
 
-    for i in range(start, start + count):
-        print(f"Fetching ghazal {i}...", end=" ")
-        ghazal = fetch_ghazal(i)
+async def _bounded_fetch(sem: asyncio.Semaphore, limiter: AsyncLimiter,
+                         pool: ProcessPoolExecutor, session: aiohttp.ClientSession,
+                         ghazal_num: int, delay: float) -> dict | None:
+    """Fetch one ghazal while holding a concurrency slot."""
+    async with sem:
+        ghazal = await fetch_ghazal(session, ghazal_num, limiter, pool)
 
         if ghazal:
-            ghazals.append(ghazal)
-            print(f"✓ ({len(ghazal['verses'])} verses)")
+            print(f"Fetched ghazal {ghazal_num} ✓ ({len(ghazal['verses'])} verses)")
         else:
-            print("✗")
+            print(f"Fetched ghazal {ghazal_num} ✗")
+
+        # Be respectful to the server: keep the slot for `delay` seconds
+        await asyncio.sleep(delay)
+
+    return ghazal
+
+
+async def fetch_ghazals(start: int, count: int, delay: float = 1.0,
+                        concurrency: int = DEFAULT_CONCURRENCY,
+                        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE) -> list:
+    """
+    Fetch multiple ghazals concurrently.
+
+    The semaphore caps requests in flight; the token bucket caps the
+    sustained rate, so bursts never exceed requests_per_minute.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    limiter = AsyncLimiter(requests_per_minute, 60)
+    # One pooled keep-alive connection per slot, so each TLS handshake is
+    # paid once per connection rather than once per ghazal
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency,
+                                     keepalive_timeout=30)
 
-        # Be respectful to the server
-        time.sleep(delay)
+    with ProcessPoolExecutor() as pool:
+        async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
+            await _warm_up(session)
+            tasks = [_bounded_fetch(sem, limiter, pool, session, i, delay)
+                     for i in range(start, start + count)]
+            results = await asyncio.gather(*tasks)
 
-    return ghazals
+    # gather preserves task order, so the output stays sorted by ghazal number
+    return [g for g in results if g]
 
 
 def save_ghazals(ghazals: list, output_file: str):
@@ -128,8 +226,9 @@ def save_ghazals(ghazals: list, output_file: str):
         "ghazals": ghazals
     }
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    # orjson writes UTF-8 bytes directly (no ASCII escaping of Persian text)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
 
     print(f"\nSaved {len(ghazals)} ghazals to {output_file}")
 
@@ -140,11 +239,15 @@ def main():
     parser.add_argument("--count", "-c", type=int, default=5, help="Number of ghazals to fetch")
     parser.add_argument("--output", "-o", default="real_ghazals.json", help="Output JSON file")
     parser.add_argument("--delay", "-d", type=float, default=1.0, help="Delay between requests (seconds)")
+    parser.add_argument("--concurrency", "-j", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum concurrent requests")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Maximum sustained requests per minute")
 
     args = parser.parse_args()
 
     print(f"Fetching ghazals {args.start} to {args.start + args.count - 1} from Ganjoor...")
-    ghazals = fetch_ghazals(args.start, args.count, args.delay)
+    ghazals = asyncio.run(fetch_ghazals(args.start, args.count, args.delay, args.concurrency, args.rpm))
 
     if ghazals:
         save_ghazals(ghazals, args.output)
@@ -10,14 +10,65 @@ Usage:
     python ganjoor_fetcher.py --poem-id 12345
 """
 
+import asyncio
+import httpx
 import requests
-import json
 import argparse
+import functools
+import orjson
+import os
+import queue
+import re
+import sqlite3
+import threading
 import time
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+from aiolimiter import AsyncLimiter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from agents.models import Verse
 
 BASE_URL = "https://api.ganjoor.net/api/ganjoor"
 
+# Maximum poem requests in flight at once on the async path
+DEFAULT_CONCURRENCY = 64
+
+# Over HTTP/2 these requests are multiplexed as streams on a few connections
+ASYNC_LIMITS = httpx.Limits(max_connections=10, max_keepalive_connections=10)
+
+# Worker threads for the sync (non-asyncio) range fetch
+DEFAULT_THREADS = 16
+
+# Sustained request rate (token bucket); Ganjoor's API comfortably serves this
+DEFAULT_RPS = 5.0
+
+# The index of all 3230 ghazals rarely changes; keep a copy between runs
+INDEX_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "divan", "ganjoor_index.json")
+INDEX_CACHE_TTL = 7 * 24 * 3600  # seconds
+
+# Validators (ETag / Last-Modified) and bodies for conditional re-fetches;
+# poem bodies stored here are also served directly by the poem cache
+HTTP_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "divan", "http_cache.sqlite")
+
+# Ganjoor's JSON (Persian text, repeated keys) compresses well; only
+# advertise brotli when it is installed, since urllib3/httpx need it to decode
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "br, gzip"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip"
+
+# Titles look like "غزل شمارهٔ ۱": map Persian digits to ASCII, then find the number
+_PERSIAN_DIGITS = str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789')
+_NUM_RE = re.compile(r'\d+')
+
+# Retry policy for transient failures (rate limiting, gateway errors)
+MAX_RETRIES = 3
+BACKOFF_FACTOR = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
 # Known poet IDs from Ganjoor (verified from /api/ganjoor/poets endpoint)
 POETS = {
     "moulavi": 5,      # Rumi - جلال الدین محمد مولوی
@@ -36,32 +87,186 @@ RUMI_CATEGORIES = {
 }
 
 
+def _retry_delay(headers, attempt: int) -> float:
+    """Honour a numeric Retry-After header, else back off exponentially."""
+    retry_after = headers.get("Retry-After", "")
+    if retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * 2 ** attempt
+
+
+# Pure string helpers, memoized as module functions (lru_cache on a method
+# would also key on, and keep alive, self)
+@functools.lru_cache(maxsize=4096)
+def _extract_ghazal_number(title: str) -> int:
+    """Extract ghazal number from title like 'غزل شمارهٔ ۱'."""
+    match = _NUM_RE.search(title.translate(_PERSIAN_DIGITS))
+    return int(match.group()) if match else 0
+
+
+@functools.lru_cache(maxsize=4096)
+def _extract_rhyme(text: str) -> str:
+    """Extract approximate rhyme pattern from text."""
+    # Simple extraction of last few characters
+    words = text.strip().split()
+    if words:
+        last_word = words[-1]
+        if len(last_word) >= 2:
+            return f"-{last_word[-2:]}"
+    return ""
+
+
+def _load_cached_index(path: str = INDEX_CACHE_PATH) -> Optional[list]:
+    """Return the on-disk ghazal index, or None if it is missing or stale."""
+    try:
+        if time.time() - os.path.getmtime(path) >= INDEX_CACHE_TTL:
+            return None
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cached_index(index: list, path: str = INDEX_CACHE_PATH):
+    """Write the index atomically, so a crashed run never leaves a torn file."""
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(index))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        # Only a cache: a full disk or read-only ~/.cache must not stop the fetch
+        print(f"  Warning: could not cache the ghazal index: {e}")
+
+
+class HttpCache:
+    """
+    SQLite store of response bodies with their ETag/Last-Modified validators.
+
+    A re-fetch sends the validators; a 304 Not Modified then has no body to
+    download, and the stored one is used. Safe to share across threads.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH):
+        self._lock = threading.Lock()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.conn = self._open(path)
+        except (OSError, sqlite3.Error) as e:
+            # Unwritable cache location: keep this run's responses in memory
+            print(f"  Warning: could not open HTTP cache at {path}: {e}")
+            self.conn = self._open(":memory:")
+
+    @staticmethod
+    def _open(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS http_cache "
+            "(url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body BLOB NOT NULL)"
+        )
+        conn.commit()
+        return conn
+
+    def get(self, url: str) -> Optional[tuple]:
+        """(etag, last_modified, body) for url, or None."""
+        with self._lock:
+            return self.conn.execute(
+                "SELECT etag, last_modified, body FROM http_cache WHERE url = ?", (url,)
+            ).fetchone()
+
+    @staticmethod
+    def conditional_headers(entry: Optional[tuple]) -> dict:
+        """If-None-Match / If-Modified-Since headers for a cached entry."""
+        headers = {}
+        if entry:
+            etag, last_modified, _ = entry
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def store(self, url: str, response_headers, body: bytes, keep_unvalidated: bool = False):
+        """
+        Keep body if the server gave validators to revalidate it with later.
+
+        keep_unvalidated keeps it regardless, for bodies that are served
+        as stored (poems). A failed write, e.g. on a full disk or a
+        read-only cache, only skips caching; the body was already fetched.
+        """
+        etag = response_headers.get("ETag")
+        last_modified = response_headers.get("Last-Modified")
+        if not (etag or last_modified or keep_unvalidated):
+            return
+        try:
+            with self._lock:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO http_cache (url, etag, last_modified, body) VALUES (?, ?, ?, ?)",
+                    (url, etag, last_modified, body)
+                )
+                self.conn.commit()
+        except sqlite3.Error as e:
+            print(f"  Warning: could not cache {url}: {e}")
+
+    def close(self):
+        self.conn.close()
+
+
 class GanjoorFetcher:
-    def __init__(self, delay: float = 1.0):
+    HEADERS = {
+        "Accept": "application/json",
+        "Accept-Encoding": _ACCEPT_ENCODING,
+        "User-Agent": "DivanTranslationProject/1.0"
+    }
+
+    def __init__(self, rps: float = DEFAULT_RPS, concurrency: int = DEFAULT_CONCURRENCY,
+                 refresh_index: bool = False, poem_cache: bool = True):
         """
         Initialize the fetcher.
 
         Args:
-            delay: Seconds to wait between API calls (be respectful!)
+            rps: Maximum API calls per second (be respectful!)
+            concurrency: Maximum simultaneous requests for afetch_divan_ghazals
+            refresh_index: Ignore the on-disk index cache and fetch it anew
+            poem_cache: Serve previously fetched poems from the HTTP cache
+                without revalidating them first
         """
-        self.delay = delay
+        self.rps = rps
+        self.concurrency = concurrency
+        self.refresh_index = refresh_index
+        self.poem_cache = poem_cache
+        self._index = None  # memoized ghazal index for this process
+        self.http_cache = HttpCache()
+        # Token bucket shared by every async request, retries included
+        self.limiter = AsyncLimiter(rps, 1)
+        # Sync equivalent: the next time a threaded request may start
+        self._rate_lock = threading.Lock()
+        self._next_request = 0.0
         self.session = requests.Session()
-        self.session.headers.update({
-            "Accept": "application/json",
-            "User-Agent": "DivanTranslationProject/1.0"
-        })
+        self.session.headers.update(self.HEADERS)
+        self.session.headers["Connection"] = "keep-alive"
+        # Size the keep-alive pool for concurrent use, and let urllib3 retry
+        # transient errors (honouring Retry-After) like the async path does
+        adapter = HTTPAdapter(
+            pool_connections=concurrency,
+            pool_maxsize=concurrency,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=BACKOFF_FACTOR,
+                status_forcelist=sorted(RETRY_STATUSES),
+                respect_retry_after_header=True,
+            ),
+        )
+        self.session.mount("https://", adapter)
 
     def get_poets(self) -> list:
         """Get list of all poets."""
-        response = self.session.get(f"{BASE_URL}/poets")
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"{BASE_URL}/poets")
 
     def get_poet_info(self, poet_id: int) -> dict:
         """Get detailed info about a poet."""
-        response = self.session.get(f"{BASE_URL}/poet/{poet_id}")
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"{BASE_URL}/poet/{poet_id}")
 
     def get_page(self, url_path: str) -> dict:
         """
@@ -74,15 +279,11 @@ class GanjoorFetcher:
         if url_path.startswith("/"):
             url_path = url_path[1:]
 
-        response = self.session.get(f"{BASE_URL}/page?url={url_path}")
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"{BASE_URL}/page?url={url_path}")
 
     def get_poem(self, poem_id: int) -> dict:
         """Get a specific poem by ID."""
-        response = self.session.get(f"{BASE_URL}/poem/{poem_id}")
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"{BASE_URL}/poem/{poem_id}")
 
     def get_poem_by_url(self, url: str) -> dict:
         """Get a poem by its URL path using the page endpoint."""
@@ -98,30 +299,70 @@ class GanjoorFetcher:
         if poet_id:
             params["poetId"] = poet_id
 
-        response = self.session.get(f"{BASE_URL}/poems/search", params=params)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(f"{BASE_URL}/poems/search", params=params)
 
     def get_ghazal_index(self) -> list:
         """
         Get the full index of ghazals from category 99.
         Returns list of {id, title, urlSlug, excerpt} for all 3230 ghazals.
+
+        Served from memory or the disk cache (see INDEX_CACHE_TTL) when possible.
         """
-        response = self.session.get(f"{BASE_URL}/cat/99")
+        index = self._cached_index()
+        if index is None:
+            data = orjson.loads(self._get_body(f"{BASE_URL}/cat/99"))
+            index = self._remember_index(data.get("cat", {}).get("poems", []))
+        return index
+
+    def _get_json(self, url: str, **kwargs):
+        """GET a JSON endpoint; the API always sends UTF-8, so decode the bytes directly."""
+        response = self.session.get(url, **kwargs)
         response.raise_for_status()
-        data = response.json()
-        return data.get("cat", {}).get("poems", [])
+        return orjson.loads(response.content)
+
+    def _get_body(self, url: str, keep_unvalidated: bool = False) -> bytes:
+        """GET url, revalidating a cached copy so unchanged bodies aren't re-sent."""
+        cached = self.http_cache.get(url)
+        response = self.session.get(url, headers=HttpCache.conditional_headers(cached))
+        if response.status_code == 304 and cached:
+            return cached[2]
+        response.raise_for_status()
+        self.http_cache.store(url, response.headers, response.content, keep_unvalidated)
+        return response.content
+
+    def _cached_poem(self, url: str) -> Optional[bytes]:
+        """With poem_cache on, a stored poem body to use without any request."""
+        if not self.poem_cache:
+            return None
+        cached = self.http_cache.get(url)
+        return cached[2] if cached else None
+
+    def _cached_index(self) -> Optional[list]:
+        """The index from memory, else from disk unless refresh_index is set."""
+        if self._index is None and not self.refresh_index:
+            self._index = _load_cached_index()
+        return self._index
+
+    def _remember_index(self, index: list) -> list:
+        """Memoize a freshly fetched index and persist it for later runs."""
+        self._index = index
+        _save_cached_index(index)
+        return index
 
     def fetch_ghazal_by_poem_id(self, poem_id: int) -> Optional[dict]:
         """
         Fetch a specific ghazal by its Ganjoor poem ID.
         """
+        url = f"{BASE_URL}/poem/{poem_id}"
         try:
-            response = self.session.get(f"{BASE_URL}/poem/{poem_id}")
-            response.raise_for_status()
-            poem_data = response.json()
+            body = self._cached_poem(url)
+            if body is None:
+                self._throttle()
+                body = self._get_body(url, keep_unvalidated=True)
+            # Bytes straight to orjson: no charset sniffing or str copy
+            poem_data = orjson.loads(body)
             return self._parse_poem_response(poem_data)
-        except requests.RequestException as e:
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
             print(f"  Error fetching poem {poem_id}: {e}")
             return None
 
@@ -145,11 +386,24 @@ class GanjoorFetcher:
 
         return self.fetch_ghazal_by_poem_id(poem_id)
 
-    def fetch_divan_ghazals(self, start: int = 1, count: int = 100) -> list:
+    def _throttle(self):
+        """Block until this thread may send its next request at self.rps."""
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request)
+            self._next_request = start + 1 / self.rps
+        time.sleep(start - now)
+
+    def fetch_divan_ghazals(self, start: int = 1, count: int = 100,
+                            max_workers: int = DEFAULT_THREADS,
+                            on_ghazal: Optional[Callable[[dict], None]] = None) -> list:
         """
         Fetch ghazals from Rumi's Divan-e Shams by number range.
 
-        First fetches the index to get poem IDs, then fetches each poem.
+        First fetches the index to get poem IDs, then fetches the poems on a
+        thread pool sharing the pooled session (the sync alternative to
+        afetch_divan_ghazals). Requests are spaced at self.rps overall.
+        Each fetched ghazal is also passed to on_ghazal, if given.
         """
         ghazals = []
 
@@ -164,22 +418,121 @@ class GanjoorFetcher:
         end = min(start + count - 1, len(index))
         print(f"Fetching ghazals {start} to {end}...")
 
-        for num in range(start, end + 1):
-            print(f"Fetching ghazal #{num}...", end=" ", flush=True)
-
-            ghazal = self.fetch_ghazal_by_number(num, index)
+        nums = range(start, end + 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.fetch_ghazal_by_number, num, index) for num in nums]
 
-            if ghazal:
-                ghazals.append(ghazal)
-                print(f"✓ ({len(ghazal['verses'])} verses)")
-            else:
-                print("✗")
+            # Collect in submission order, so output stays sorted by number
+            for num, future in zip(nums, futures):
+                ghazal = future.result()
 
-            # Be respectful to the server
-            time.sleep(self.delay)
+                if ghazal:
+                    ghazals.append(ghazal)
+                    if on_ghazal:
+                        on_ghazal(ghazal)
+                    print(f"Fetched ghazal #{num} ✓ ({len(ghazal['verses'])} verses)")
+                else:
+                    print(f"Fetched ghazal #{num} ✗")
 
         return ghazals
 
+    async def _aget_json(self, client: httpx.AsyncClient, url: str):
+        """GET a JSON endpoint within the rate limit (see _aget_body)."""
+        return orjson.loads(await self._aget_body(client, url))
+
+    async def _aget_body(self, client: httpx.AsyncClient, url: str,
+                         keep_unvalidated: bool = False) -> bytes:
+        """
+        GET a response body within the rate limit.
+
+        429/5xx responses are retried with exponential backoff, or after the
+        server's Retry-After if it sends one. A cached copy is revalidated
+        with its ETag/Last-Modified, and reused on 304 Not Modified.
+        """
+        cached = self.http_cache.get(url)
+        headers = HttpCache.conditional_headers(cached)
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with self.limiter:
+                    response = await client.get(url, headers=headers)
+                if response.status_code == 304 and cached:
+                    return cached[2]
+                if response.status_code in RETRY_STATUSES and attempt < MAX_RETRIES:
+                    delay = _retry_delay(response.headers, attempt)
+                else:
+                    response.raise_for_status()
+                    self.http_cache.store(url, response.headers, response.content, keep_unvalidated)
+                    return response.content
+            except httpx.TransportError:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = BACKOFF_FACTOR * 2 ** attempt
+            # Sleep outside the limiter so a backing-off request holds no token
+            await asyncio.sleep(delay)
+
+    async def _afetch_ghazal(self, client: httpx.AsyncClient, sem: asyncio.Semaphore,
+                             num: int, poem_id: int,
+                             on_ghazal: Optional[Callable[[dict], None]] = None) -> Optional[dict]:
+        """Async twin of fetch_ghazal_by_poem_id; only the network call is async."""
+        # Cached poems are served without taking a concurrency slot
+        url = f"{BASE_URL}/poem/{poem_id}"
+        body = self._cached_poem(url)
+        try:
+            if body is None:
+                async with sem:
+                    body = await self._aget_body(client, url, keep_unvalidated=True)
+            poem_data = orjson.loads(body)
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            print(f"  Error fetching poem {poem_id}: {e}")
+            poem_data = None
+
+        ghazal = self._parse_poem_response(poem_data) if poem_data else None
+        if ghazal:
+            if on_ghazal:
+                on_ghazal(ghazal)
+            print(f"Fetched ghazal #{num} ✓ ({len(ghazal['verses'])} verses)")
+        else:
+            print(f"Fetched ghazal #{num} ✗")
+        return ghazal
+
+    async def afetch_divan_ghazals(self, start: int = 1, count: int = 100,
+                                   on_ghazal: Optional[Callable[[dict], None]] = None) -> list:
+        """
+        Concurrent version of fetch_divan_ghazals.
+
+        Up to self.concurrency poems are fetched at once, multiplexed over
+        HTTP/2 on one pooled client, at no more than self.rps requests per
+        second; results keep ghazal-number order. on_ghazal, if given, is
+        called with each ghazal as soon as it is parsed.
+        """
+        async with httpx.AsyncClient(http2=True, limits=ASYNC_LIMITS, headers=self.HEADERS) as client:
+            print("Fetching ghazal index from Ganjoor...")
+            try:
+                index = self._cached_index()
+                if index is None:
+                    data = await self._aget_json(client, f"{BASE_URL}/cat/99")
+                    index = self._remember_index(data.get("cat", {}).get("poems", []))
+                print(f"Found {len(index)} ghazals in index")
+            except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+                print(f"Error fetching index: {e}")
+                return []
+
+            end = min(start + count - 1, len(index))
+            print(f"Fetching ghazals {start} to {end}...")
+
+            sem = asyncio.Semaphore(self.concurrency)
+            tasks = []
+            for num in range(start, end + 1):
+                # Same range check as fetch_ghazal_by_number; index[-1] must not pass for ghazal 0
+                if num < 1:
+                    print(f"  Ghazal {num} out of range (1-{len(index)})")
+                    print(f"Fetched ghazal #{num} ✗")
+                    continue
+                tasks.append(self._afetch_ghazal(client, sem, num, index[num - 1]["id"], on_ghazal))
+            results = await asyncio.gather(*tasks)
+
+        return [g for g in results if g]
+
     def _parse_poem_response(self, poem_data: dict) -> Optional[dict]:
         """Parse the /poem/{id} API response into our standard ghazal format."""
         try:
@@ -188,7 +541,7 @@ class GanjoorFetcher:
 
             # Extract ghazal number from title (e.g., "غزل شمارهٔ ۱")
             title = poem_data.get("title", "")
-            ghazal_num = self._extract_ghazal_number(title)
+            ghazal_num = _extract_ghazal_number(title)
 
             # Parse verses from plainText (cleaner than HTML)
             plain_text = poem_data.get("plainText", "")
@@ -198,8 +551,8 @@ class GanjoorFetcher:
                 return None
 
             # Extract rhyme from last hemistich
-            last_hemistich = verses[-1]["hemistich2"] if verses else ""
-            rhyme = self._extract_rhyme(last_hemistich)
+            last_hemistich = verses[-1].hemistich2 if verses else ""
+            rhyme = _extract_rhyme(last_hemistich)
 
             # Get meter if available
             meter = poem_data.get("rhythm", "")
@@ -221,41 +574,24 @@ class GanjoorFetcher:
             print(f"Error parsing poem response: {e}")
             return None
 
-    def _extract_ghazal_number(self, title: str) -> int:
-        """Extract ghazal number from title like 'غزل شمارهٔ ۱'."""
-        import re
-        # Convert Persian digits to Arabic
-        persian_to_arabic = str.maketrans('۰۱۲۳۴۵۶۷۸۹', '0123456789')
-        title_ascii = title.translate(persian_to_arabic)
-        # Find number
-        match = re.search(r'\d+', title_ascii)
-        return int(match.group()) if match else 0
-
     def _parse_plain_text_verses(self, plain_text: str) -> list:
         """
         Parse verses from plainText format.
 
         The plainText format has each hemistich on its own line.
         Lines alternate: hemistich1, hemistich2, hemistich1, hemistich2...
-        So we pair them up to form couplets (beyts).
+        So we pair them up to form couplets (beyts), returned as Verse objects.
         """
-        import re
-        verses = []
-
-        # Normalize line endings and split
-        text = plain_text.replace('\r\n', '\n').replace('\r', '\n')
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        # splitlines() handles LF, CR and CRLF itself; strip each line once
+        lines = [line for line in map(str.strip, plain_text.splitlines()) if line]
 
-        # Pair up lines into couplets
-        for i in range(0, len(lines), 2):
-            hemistich1 = lines[i] if i < len(lines) else ""
-            hemistich2 = lines[i + 1] if i + 1 < len(lines) else ""
+        # Pair up lines into couplets: zip pulls two lines per step from one iterator
+        it = iter(lines)
+        verses = [Verse(h1, h2) for h1, h2 in zip(it, it)]
 
-            if hemistich1:  # At least first hemistich must exist
-                verses.append({
-                    "hemistich1": hemistich1,
-                    "hemistich2": hemistich2
-                })
+        # An odd trailing hemistich becomes a half-filled beyt
+        if len(lines) % 2:
+            verses.append(Verse(lines[-1], ""))
 
         return verses
 
@@ -267,20 +603,16 @@ class GanjoorFetcher:
             # Ganjoor returns verses as a flat list
             # Each beyt (couplet) has two hemistichs
             if "verses" in poem_data:
-                verse_list = poem_data["verses"]
-                for i in range(0, len(verse_list), 2):
-                    if i + 1 < len(verse_list):
-                        verses.append({
-                            "hemistich1": verse_list[i].get("text", ""),
-                            "hemistich2": verse_list[i + 1].get("text", "")
-                        })
+                # Consume hemistichs pairwise; an odd trailing one is dropped
+                it = iter(poem_data["verses"])
+                verses = [Verse(h1.get("text", ""), h2.get("text", "")) for h1, h2 in zip(it, it)]
 
             if not verses:
                 return None
 
             # Extract rhyme from last word of last hemistich
-            last_verse = verses[-1]["hemistich2"] if verses else ""
-            rhyme = self._extract_rhyme(last_verse)
+            last_verse = verses[-1].hemistich2 if verses else ""
+            rhyme = _extract_rhyme(last_verse)
 
             return {
                 "number": poem_data.get("id", 0),
@@ -297,29 +629,67 @@ class GanjoorFetcher:
             print(f"Error parsing poem: {e}")
             return None
 
-    def _extract_rhyme(self, text: str) -> str:
-        """Extract approximate rhyme pattern from text."""
-        # Simple extraction of last few characters
-        words = text.strip().split()
-        if words:
-            last_word = words[-1]
-            if len(last_word) >= 2:
-                return f"-{last_word[-2:]}"
-        return ""
 
+OUTPUT_META = {
+    "source": "Divan-e Shams-e Tabrizi (Divan-e Kabir)",
+    "edition": "Ganjoor.net (based on Foruzanfar edition)",
+    "fetched_from": "api.ganjoor.net",
+    "note": "Fetched via Ganjoor API",
+}
 
-def save_ghazals(ghazals: list, output_file: str):
-    """Save fetched ghazals to JSON file."""
-    data = {
-        "source": "Divan-e Shams-e Tabrizi (Divan-e Kabir)",
-        "edition": "Ganjoor.net (based on Foruzanfar edition)",
-        "fetched_from": "api.ganjoor.net",
-        "note": "Fetched via Ganjoor API",
-        "ghazals": ghazals
-    }
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+class JsonlWriter:
+    """
+    Single writer thread appending ghazals to a JSON Lines file as they arrive.
+
+    Fetchers put() each ghazal and carry on; serialization and disk writes
+    happen on the writer thread. Lines are in arrival order, and each one
+    carries its ghazal number. The first line is a {"meta": ...} header.
+    """
+
+    _DONE = object()
+
+    def __init__(self, output_file: str, meta: dict = OUTPUT_META, maxsize: int = 128):
+        self.output_file = output_file
+        self.count = 0
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._file = open(output_file, 'wb')
+        self._file.write(orjson.dumps({"meta": meta}, option=orjson.OPT_APPEND_NEWLINE))
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def put(self, ghazal: dict):
+        self._queue.put(ghazal)
+
+    def _run(self):
+        while (ghazal := self._queue.get()) is not self._DONE:
+            self._file.write(orjson.dumps(ghazal, option=orjson.OPT_APPEND_NEWLINE))
+            self.count += 1
+        self._file.close()
+
+    def close(self):
+        """Flush everything queued so far and wait for the writer to finish."""
+        self._queue.put(self._DONE)
+        self._thread.join()
+        print(f"Saved {self.count} ghazals to {self.output_file}")
+
+
+def save_ghazals(ghazals: list, output_file: str):
+    """
+    Save fetched ghazals to JSON file.
+
+    A .jsonl output is written as JSON Lines instead: a {"meta": ...}
+    header line, then one ghazal per line, serialized one at a time.
+    """
+    # orjson emits UTF-8 bytes directly (no ASCII escaping of Persian text)
+    with open(output_file, 'wb') as f:
+        if output_file.endswith(".jsonl"):
+            f.write(orjson.dumps({"meta": OUTPUT_META}, option=orjson.OPT_APPEND_NEWLINE))
+            for ghazal in ghazals:
+                f.write(orjson.dumps(ghazal, option=orjson.OPT_APPEND_NEWLINE))
+        else:
+            data = {**OUTPUT_META, "ghazals": ghazals}
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE))
 
     print(f"Saved {len(ghazals)} ghazals to {output_file}")
 
@@ -328,15 +698,26 @@ def main():
     parser = argparse.ArgumentParser(description="Fetch Persian poetry from Ganjoor API")
     parser.add_argument("--start", "-s", type=int, default=1, help="Starting ghazal number")
     parser.add_argument("--count", "-c", type=int, default=5, help="Number of ghazals to fetch")
-    parser.add_argument("--output", "-o", default="real_ghazals.json", help="Output JSON file")
-    parser.add_argument("--delay", "-d", type=float, default=1.0, help="Delay between API calls (seconds)")
+    parser.add_argument("--output", "-o", default="real_ghazals.json",
+                        help="Output JSON file (.jsonl for one ghazal per line)")
+    parser.add_argument("--sync", action="store_true",
+                        help="Fetch a range with a thread pool instead of asyncio")
+    parser.add_argument("--rps", type=float, default=DEFAULT_RPS, help="Maximum API calls per second")
+    parser.add_argument("--concurrency", "-j", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum concurrent requests when fetching a range")
     parser.add_argument("--ghazal", "-g", type=int, help="Fetch a specific ghazal by number")
     parser.add_argument("--search", help="Search for poems containing text")
     parser.add_argument("--debug", action="store_true", help="Print raw API response")
+    parser.add_argument("--refresh-index", action="store_true",
+                        help="Re-download the ghazal index instead of using the cached copy")
+    parser.add_argument("--no-poem-cache", action="store_true",
+                        help="Revalidate cached poems with Ganjoor instead of using them as stored")
 
     args = parser.parse_args()
 
-    fetcher = GanjoorFetcher(delay=args.delay)
+    fetcher = GanjoorFetcher(rps=args.rps, concurrency=args.concurrency,
+                             refresh_index=args.refresh_index,
+                             poem_cache=not args.no_poem_cache)
 
     if args.ghazal:
         # Fetch single ghazal by number
@@ -353,12 +734,12 @@ def main():
 
         if args.debug:
             # Print raw API response for debugging
-            response = fetcher.session.get(f"{BASE_URL}/poem/{poem_id}")
-            print(json.dumps(response.json(), ensure_ascii=False, indent=2))
+            print(orjson.dumps(fetcher.get_poem(poem_id), option=orjson.OPT_INDENT_2).decode())
         else:
             ghazal = fetcher.fetch_ghazal_by_poem_id(poem_id)
             if ghazal:
-                print(json.dumps(ghazal, ensure_ascii=False, indent=2))
+                # orjson serializes the Verse dataclasses as hemistich dicts
+                print(orjson.dumps(ghazal, option=orjson.OPT_INDENT_2).decode())
             else:
                 print("Failed to fetch ghazal")
 
@@ -366,13 +747,25 @@ def main():
         # Search poems
         print(f"Searching for '{args.search}'...")
         results = fetcher.search_poems(args.search, poet_id=POETS["moulavi"])
-        print(json.dumps(results, ensure_ascii=False, indent=2))
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())
 
     else:
-        # Fetch collection
-        print(f"Fetching ghazals {args.start} to {args.start + args.count - 1}...")
-        ghazals = fetcher.fetch_divan_ghazals(start=args.start, count=args.count)
-        save_ghazals(ghazals, args.output)
+        # Fetch collection; the fetchers report the range they actually fetch
+        # JSON Lines output is written while fetching, by a writer thread
+        writer = JsonlWriter(args.output) if args.output.endswith(".jsonl") else None
+        on_ghazal = writer.put if writer else None
+        try:
+            if args.sync:
+                ghazals = fetcher.fetch_divan_ghazals(start=args.start, count=args.count,
+                                                      on_ghazal=on_ghazal)
+            else:
+                ghazals = asyncio.run(fetcher.afetch_divan_ghazals(start=args.start, count=args.count,
+                                                                   on_ghazal=on_ghazal))
+        finally:
+            if writer:
+                writer.close()
+        if not writer:
+            save_ghazals(ghazals, args.output)
 
 
 if __name__ == "__main__":
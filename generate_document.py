@@ -4,206 +4,126 @@ Generate formatted output documents from translations.
 Supports Markdown and HTML output.
 """
 
-import json
 import argparse
+import orjson
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from datetime import datetime
 
 
-def generate_markdown(translations_file: str, output_file: str):
-    """Generate a formatted Markdown document."""
-
-    with open(translations_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    lines = []
-
-    # Header
-    lines.append("# Divan-e Kabir: Selected Translations")
-    lines.append("")
-    lines.append("**From the Poetry of Jalal al-Din Rumi (Mawlana)**")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-    lines.append("## About This Translation")
-    lines.append("")
-    lines.append(f"**Source**: {data['source']}")
-    lines.append(f"")
-    lines.append(f"**Edition**: {data['edition']}")
-    lines.append(f"")
-    lines.append(f"**Translation Method**: {data['translation_method']}")
-    lines.append("")
-    lines.append("This translation follows the approach of scholar Omid Safi, preserving the Islamic and Sufi context of Rumi's poetry rather than universalizing it into generic spirituality. Key principles include:")
-    lines.append("")
-    lines.append("- Preserving references to Islamic prayer, Hajj, Quran, and hadith")
-    lines.append("- Maintaining Sufi terminology (fana, baqa, sama', etc.)")
-    lines.append("- Keeping the ambiguity of \"the Beloved\" (which may refer to God, Shams, or earthly love)")
-    lines.append("- Providing scholarly notes on context and allusions")
-    lines.append("")
-    lines.append("---")
-    lines.append("")
-
-    # Each ghazal
-    for t in data["translations"]:
-        lines.append(f"## Ghazal {t['number']}")
-        lines.append("")
-        lines.append(f"*Meter: {t['meter']} | Rhyme: {t['rhyme']}*")
-        lines.append("")
-
-        # Persian text
-        lines.append("### Persian Text")
-        lines.append("")
-        for verse in t["persian_text"]:
-            lines.append(f"> {verse['hemistich1']}")
-            lines.append(f"> {verse['hemistich2']}")
-            lines.append(">")
-        lines.append("")
-
-        # English translation
-        lines.append("### English Translation")
-        lines.append("")
-        lines.append(t["english_translation"])
-        lines.append("")
-
-        # Notes
-        if t["scholarly_notes"]:
-            lines.append("### Scholarly Notes")
-            lines.append("")
-            lines.append(t["scholarly_notes"])
-            lines.append("")
-
-        lines.append("---")
-        lines.append("")
-
-    # Footer
-    lines.append("## Colophon")
-    lines.append("")
-    lines.append(f"Generated: {datetime.now().strftime('%B %d, %Y')}")
-    lines.append("")
-    lines.append("This is an open-source translation project. Contributions, corrections, and scholarly input are welcome.")
-    lines.append("")
-    lines.append("*\"The wound is the place where the Light enters you.\" — Rumi*")
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(lines))
-
-    print(f"Markdown document saved to {output_file}")
-
-
-def generate_html(translations_file: str, output_file: str):
-    """Generate a beautifully formatted HTML document."""
-
-    with open(translations_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-
-    html = f"""<!DOCTYPE html>
+# Static parts of the HTML page. Plain strings, not f-strings: the stylesheet
+# has no runtime data, so there is nothing to re-interpolate on each call.
+_HTML_HEAD_PREFIX = """<!DOCTYPE html>
 <html lang="en" dir="ltr">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Divan-e Kabir: Selected Translations</title>
     <style>
-        :root {{
+"""
+
+_CSS = """        :root {
             --primary: #1a365d;
             --secondary: #2c5282;
             --accent: #c69749;
             --bg: #faf9f7;
             --text: #2d3748;
             --light: #e2e8f0;
-        }}
+        }
 
-        * {{
+        * {
             margin: 0;
             padding: 0;
             box-sizing: border-box;
-        }}
+        }
 
-        body {{
+        body {
             font-family: 'Crimson Text', 'Georgia', serif;
             background: var(--bg);
             color: var(--text);
             line-height: 1.8;
             padding: 2rem;
-        }}
+        }
 
-        .container {{
+        .container {
             max-width: 800px;
             margin: 0 auto;
-        }}
+        }
 
-        header {{
+        header {
             text-align: center;
             padding: 3rem 0;
             border-bottom: 2px solid var(--accent);
             margin-bottom: 3rem;
-        }}
+        }
 
-        h1 {{
+        h1 {
             font-size: 2.5rem;
             color: var(--primary);
             margin-bottom: 0.5rem;
             font-weight: normal;
             letter-spacing: 0.05em;
-        }}
+        }
 
-        .subtitle {{
+        .subtitle {
             font-size: 1.2rem;
             color: var(--secondary);
             font-style: italic;
-        }}
+        }
 
-        .about {{
+        .about {
             background: white;
             padding: 2rem;
             border-radius: 8px;
             margin-bottom: 3rem;
             box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-        }}
+        }
 
-        .about h2 {{
+        .about h2 {
             color: var(--primary);
             font-size: 1.3rem;
             margin-bottom: 1rem;
             font-weight: normal;
-        }}
+        }
 
-        .about ul {{
+        .about ul {
             margin-left: 1.5rem;
             margin-top: 1rem;
-        }}
+        }
 
-        .about li {{
+        .about li {
             margin-bottom: 0.5rem;
-        }}
+        }
 
-        .ghazal {{
+        .ghazal {
             background: white;
             padding: 2.5rem;
             border-radius: 8px;
             margin-bottom: 2rem;
             box-shadow: 0 2px 8px rgba(0,0,0,0.05);
-        }}
+        }
 
-        .ghazal-header {{
+        .ghazal-header {
             display: flex;
             justify-content: space-between;
             align-items: baseline;
             border-bottom: 1px solid var(--light);
             padding-bottom: 1rem;
             margin-bottom: 1.5rem;
-        }}
+        }
 
-        .ghazal-number {{
+        .ghazal-number {
             font-size: 1.5rem;
             color: var(--primary);
-        }}
+        }
 
-        .ghazal-meta {{
+        .ghazal-meta {
             font-size: 0.9rem;
             color: #718096;
             font-style: italic;
-        }}
+        }
 
-        .persian {{
+        .persian {
             direction: rtl;
             text-align: right;
             font-family: 'Noto Naskh Arabic', 'Traditional Arabic', serif;
@@ -214,94 +134,96 @@ def generate_html(translations_file: str, output_file: str):
             border-radius: 6px;
             margin-bottom: 1.5rem;
             border-right: 3px solid var(--accent);
-        }}
+        }
 
-        .persian .verse {{
+        .persian .verse {
             margin-bottom: 1rem;
-        }}
+        }
 
-        .persian .hemistich {{
+        .persian .hemistich {
             display: block;
-        }}
+        }
 
-        .section-title {{
+        .section-title {
             font-size: 0.9rem;
             text-transform: uppercase;
             letter-spacing: 0.1em;
             color: var(--accent);
             margin-bottom: 1rem;
             font-weight: bold;
-        }}
+        }
 
-        .translation {{
+        .translation {
             font-size: 1.1rem;
             margin-bottom: 1.5rem;
-        }}
+        }
 
-        .translation p {{
+        .translation p {
             margin-bottom: 1rem;
-        }}
+        }
 
-        .translation strong {{
+        .translation strong {
             color: var(--secondary);
-        }}
+        }
 
-        .notes {{
+        .notes {
             background: #f7fafc;
             padding: 1.5rem;
             border-radius: 6px;
             font-size: 0.95rem;
             border-left: 3px solid var(--secondary);
-        }}
+        }
 
-        .notes p {{
+        .notes p {
             margin-bottom: 0.8rem;
-        }}
+        }
 
-        .notes strong {{
+        .notes strong {
             color: var(--primary);
-        }}
+        }
 
-        .divider {{
+        .divider {
             text-align: center;
             padding: 2rem 0;
             color: var(--accent);
             font-size: 1.5rem;
-        }}
+        }
 
-        footer {{
+        footer {
             text-align: center;
             padding: 3rem 0;
             color: #718096;
             font-style: italic;
             border-top: 2px solid var(--accent);
             margin-top: 2rem;
-        }}
+        }
 
-        footer .quote {{
+        footer .quote {
             font-size: 1.1rem;
             color: var(--secondary);
             margin-top: 1rem;
-        }}
+        }
 
-        @media (max-width: 600px) {{
-            body {{
+        @media (max-width: 600px) {
+            body {
                 padding: 1rem;
-            }}
+            }
 
-            h1 {{
+            h1 {
                 font-size: 1.8rem;
-            }}
+            }
 
-            .ghazal {{
+            .ghazal {
                 padding: 1.5rem;
-            }}
+            }
 
-            .persian {{
+            .persian {
                 font-size: 1.1rem;
-            }}
-        }}
-    </style>
+            }
+        }
+"""
+
+_HTML_HEAD_SUFFIX = """    </style>
     <link href="https://fonts.googleapis.com/css2?family=Crimson+Text:ital,wght@0,400;0,600;1,400&family=Noto+Naskh+Arabic&display=swap" rel="stylesheet">
 </head>
 <body>
@@ -311,11 +233,124 @@ def generate_html(translations_file: str, output_file: str):
             <p class="subtitle">Selected Translations from the Poetry of<br>Jalal al-Din Rumi (Mawlana)</p>
         </header>
 
-        <section class="about">
+"""
+# The whole static head, encoded once at import rather than on every write
+_HTML_HEAD_BYTES = (_HTML_HEAD_PREFIX + _CSS + _HTML_HEAD_SUFFIX).encode('utf-8')
+
+# (hemistich1, hemistich2) of a verse dict in one C-level call
+_HEMISTICHS = itemgetter('hemistich1', 'hemistich2')
+
+# Escapes for text interpolated into HTML element content: one C-level pass
+# per string, where html.escape makes a str.replace pass per character.
+# Nothing is interpolated into attributes, so quotes can stay as they are.
+_HTML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+
+def _esc(text: str) -> str:
+    return text.translate(_HTML_ESCAPE)
+
+
+# Both generators stamp the same date; format it once per run
+_TODAY = datetime.now().strftime('%B %d, %Y')
+
+
+def load_translations(translations_file: str) -> dict:
+    """
+    Read a translations file: the usual single JSON object, or JSON Lines
+    with one translation per line (which carries no corpus metadata).
+    """
+    with open(translations_file, 'rb') as f:
+        if not translations_file.endswith(".jsonl"):
+            return orjson.loads(f.read())
+        translations = [orjson.loads(line) for line in f if line.strip()]
+
+    return {
+        "source": "Divan-e Kabir",
+        "edition": "Unknown",
+        "translation_method": "Unknown",
+        "translations": translations
+    }
+
+
+def generate_markdown(data: dict, output_file: str):
+    """Generate a formatted Markdown document from loaded translations."""
+
+    lines = []
+
+    # Header
+    lines.append("# Divan-e Kabir: Selected Translations")
+    lines.append("")
+    lines.append("**From the Poetry of Jalal al-Din Rumi (Mawlana)**")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+    lines.append("## About This Translation")
+    lines.append("")
+    lines.append(f"**Source**: {data['source']}")
+    lines.append(f"")
+    lines.append(f"**Edition**: {data['edition']}")
+    lines.append(f"")
+    lines.append(f"**Translation Method**: {data['translation_method']}")
+    lines.append("")
+    lines.append("This translation follows the approach of scholar Omid Safi, preserving the Islamic and Sufi context of Rumi's poetry rather than universalizing it into generic spirituality. Key principles include:")
+    lines.append("")
+    lines.append("- Preserving references to Islamic prayer, Hajj, Quran, and hadith")
+    lines.append("- Maintaining Sufi terminology (fana, baqa, sama', etc.)")
+    lines.append("- Keeping the ambiguity of \"the Beloved\" (which may refer to God, Shams, or earthly love)")
+    lines.append("- Providing scholarly notes on context and allusions")
+    lines.append("")
+    lines.append("---")
+    lines.append("")
+
+    # Each ghazal
+    for t in data["translations"]:
+        # Each field is looked up once per ghazal
+        number, meter, rhyme = t["number"], t["meter"], t["rhyme"]
+        persian, english, notes = t["persian_text"], t["english_translation"], t["scholarly_notes"]
+
+        lines.extend((f"## Ghazal {number}", "", f"*Meter: {meter} | Rhyme: {rhyme}*", ""))
+
+        # Persian text
+        lines.extend(("### Persian Text", ""))
+        # One pre-joined block per verse keeps the list (and the join) short
+        lines.extend([f"> {h1}\n> {h2}\n>" for h1, h2 in map(_HEMISTICHS, persian)])
+        lines.append("")
+
+        # English translation
+        lines.extend(("### English Translation", "", english, ""))
+
+        # Notes
+        if notes:
+            lines.extend(("### Scholarly Notes", "", notes, ""))
+
+        lines.extend(("---", ""))
+
+    # Footer
+    lines.append("## Colophon")
+    lines.append("")
+    lines.append(f"Generated: {_TODAY}")
+    lines.append("")
+    lines.append("This is an open-source translation project. Contributions, corrections, and scholarly input are welcome.")
+    lines.append("")
+    lines.append("*\"The wound is the place where the Light enters you.\" — Rumi*")
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+
+    print(f"Markdown document saved to {output_file}")
+
+
+def generate_html(data: dict, output_file: str):
+    """Generate a beautifully formatted HTML document from loaded translations."""
+
+    # Encoded chunks, handed to writelines as-is: no joined str, and no
+    # final encode of the whole document
+    buf = [_HTML_HEAD_BYTES]
+    buf.append(f"""        <section class="about">
             <h2>About This Translation</h2>
-            <p><strong>Source:</strong> {data['source']}</p>
-            <p><strong>Edition:</strong> {data['edition']}</p>
-            <p><strong>Method:</strong> {data['translation_method']}</p>
+            <p><strong>Source:</strong> {_esc(data['source'])}</p>
+            <p><strong>Edition:</strong> {_esc(data['edition'])}</p>
+            <p><strong>Method:</strong> {_esc(data['translation_method'])}</p>
             <p style="margin-top: 1rem;">This translation follows the approach of scholar Omid Safi, preserving the Islamic and Sufi context of Rumi's poetry rather than universalizing it into generic spirituality.</p>
             <ul>
                 <li>Preserving references to Islamic prayer, Hajj, Quran, and hadith</li>
@@ -324,32 +359,33 @@ def generate_html(translations_file: str, output_file: str):
                 <li>Providing scholarly notes on context and allusions</li>
             </ul>
         </section>
-"""
+""".encode('utf-8'))
 
     for t in data["translations"]:
+        # Each field is looked up once per ghazal
+        number, meter, rhyme = t["number"], _esc(t["meter"]), _esc(t["rhyme"])
+
         # Format Persian verses
-        persian_html = ""
-        for verse in t["persian_text"]:
-            persian_html += f"""<div class="verse">
-                <span class="hemistich">{verse['hemistich1']}</span>
-                <span class="hemistich">{verse['hemistich2']}</span>
-            </div>"""
+        persian_html = "".join([f"""<div class="verse">
+                <span class="hemistich">{_esc(h1)}</span>
+                <span class="hemistich">{_esc(h2)}</span>
+            </div>""" for h1, h2 in map(_HEMISTICHS, t["persian_text"])])
 
         # Format translation (convert markdown-ish to HTML)
-        translation_html = t["english_translation"].replace("\n\n", "</p><p>").replace("\n", "<br>")
+        translation_html = _esc(t["english_translation"]).replace("\n\n", "</p><p>").replace("\n", "<br>")
         if not translation_html.startswith("<p>"):
             translation_html = f"<p>{translation_html}</p>"
 
         # Format notes
-        notes_html = t["scholarly_notes"].replace("\n\n", "</p><p>").replace("\n", "<br>")
+        notes_html = _esc(t["scholarly_notes"]).replace("\n\n", "</p><p>").replace("\n", "<br>")
         if notes_html and not notes_html.startswith("<p>"):
             notes_html = f"<p>{notes_html}</p>"
 
-        html += f"""
+        buf.append(f"""
         <article class="ghazal">
             <div class="ghazal-header">
-                <span class="ghazal-number">Ghazal {t['number']}</span>
-                <span class="ghazal-meta">Meter: {t['meter']} | Rhyme: {t['rhyme']}</span>
+                <span class="ghazal-number">Ghazal {number}</span>
+                <span class="ghazal-meta">Meter: {meter} | Rhyme: {rhyme}</span>
             </div>
 
             <div class="section-title">Persian Text</div>
@@ -366,38 +402,47 @@ def generate_html(translations_file: str, output_file: str):
         </article>
 
         <div class="divider">✦</div>
-"""
+""".encode('utf-8'))
 
-    html += f"""
+    buf.append(f"""
         <footer>
-            <p>Generated: {datetime.now().strftime('%B %d, %Y')}</p>
+            <p>Generated: {_TODAY}</p>
             <p>This is an open-source translation project.<br>Contributions, corrections, and scholarly input are welcome.</p>
             <p class="quote">"The wound is the place where the Light enters you." — Rumi</p>
         </footer>
     </div>
 </body>
 </html>
-"""
+""".encode('utf-8'))
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html)
+    with open(output_file, 'wb') as f:
+        f.writelines(buf)
 
     print(f"HTML document saved to {output_file}")
 
 
 def main():
     parser = argparse.ArgumentParser(description="Generate formatted documents from translations")
-    parser.add_argument("--input", "-i", default="translations.json", help="Input translations JSON file")
+    parser.add_argument("--input", "-i", default="translations.json", help="Input translations file (.json or .jsonl)")
     parser.add_argument("--format", "-f", choices=["markdown", "html", "both"], default="both", help="Output format")
     parser.add_argument("--output", "-o", default="divan_translations", help="Output filename (without extension)")
 
     args = parser.parse_args()
 
-    if args.format in ["markdown", "both"]:
-        generate_markdown(args.input, f"{args.output}.md")
+    # Parsed once and shared; the generators only read it
+    data = load_translations(args.input)
 
+    jobs = []
+    if args.format in ["markdown", "both"]:
+        jobs.append((generate_markdown, f"{args.output}.md"))
     if args.format in ["html", "both"]:
-        generate_html(args.input, f"{args.output}.html")
+        jobs.append((generate_html, f"{args.output}.html"))
+
+    # The two outputs are independent, so build and write them side by side
+    with ThreadPoolExecutor(max_workers=len(jobs)) as pool:
+        futures = [pool.submit(generate, data, output_file) for generate, output_file in jobs]
+        for future in futures:
+            future.result()
 
 
 if __name__ == "__main__":
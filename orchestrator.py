@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Staged async orchestrator for the 4-pass translation pipeline.
+
+Each pass (Analyzer → Translator → Stylist → QA) runs as its own pool of
+worker coroutines connected by asyncio.Queues. The passes stay strictly
+ordered for a given ghazal, but different ghazals occupy different stages
+at the same time, so throughput is bound by the slowest stage rather than
+the sum of all four.
+
+Usage:
+    python orchestrator.py --input sample_ghazals.json --output pipeline_translations.json
+"""
+
+import asyncio
+import logging
+import orjson
+import os
+import sys
+from typing import Optional
+
+from agents.analyzer import ANALYZER_SYSTEM_PROMPT, get_analyzer_prompt
+from agents.translator import TRANSLATOR_SYSTEM_PROMPT, get_translator_prompt
+from agents.stylist import STYLIST_SYSTEM_PROMPT, get_stylist_prompt
+from agents.qa import QA_SYSTEM_PROMPT, get_qa_prompt
+from agents.models import Ghazal
+from agents.cache import AgentCache, NullCache
+from pipeline import TranslationPipeline, save_translations, DEFAULT_REQUESTS_PER_MINUTE
+
+log = logging.getLogger(__name__)
+
+# Worker coroutines per stage (i.e. concurrent LLM calls per pass)
+DEFAULT_WORKERS = 4
+
+
+async def run_analyzer(pipeline: TranslationPipeline, item: dict):
+    analysis = pipeline.semantic_lookup(item["ghazal"])
+    if analysis is None:
+        analysis = await pipeline.acall_agent(
+            ANALYZER_SYSTEM_PROMPT,
+            get_analyzer_prompt(item["ghazal"]),
+            "Analyzer"
+        )
+        pipeline.semantic_store(item["ghazal"], analysis)
+    item["analysis"] = analysis
+
+
+async def run_translator(pipeline: TranslationPipeline, item: dict):
+    item["literal"] = await pipeline.acall_agent(
+        TRANSLATOR_SYSTEM_PROMPT,
+        get_translator_prompt(item["ghazal"], item["analysis"]),
+        "Translator"
+    )
+
+
+async def run_stylist(pipeline: TranslationPipeline, item: dict):
+    literal_for_stylist = item["literal"].get("literal_translation", item["literal"])
+    item["refined"] = await pipeline.acall_agent(
+        STYLIST_SYSTEM_PROMPT,
+        get_stylist_prompt(item["ghazal"], item["analysis"], literal_for_stylist),
+        "Stylist"
+    )
+
+
+async def run_qa(pipeline: TranslationPipeline, item: dict):
+    item["qa"] = pipeline.qa_shortcut(item["refined"])
+    if item["qa"] is not None:
+        return
+    literal_for_stylist = item["literal"].get("literal_translation", item["literal"])
+    refined_for_qa = item["refined"].get("refined_translation", item["refined"])
+    item["qa"] = await pipeline.acall_agent(
+        QA_SYSTEM_PROMPT,
+        get_qa_prompt(item["ghazal"], item["analysis"], literal_for_stylist, refined_for_qa),
+        "QA"
+    )
+
+
+STAGES = [
+    ("Analyzer", run_analyzer),
+    ("Translator", run_translator),
+    ("Stylist", run_stylist),
+    ("QA", run_qa),
+]
+
+
+async def _stage_worker(pipeline: TranslationPipeline, name: str, step,
+                        in_q: asyncio.Queue, out_q: asyncio.Queue):
+    """Pull items from in_q, run one pass on them, and push them to out_q."""
+    while True:
+        item = await in_q.get()
+        ghazal_num = item["ghazal"].number
+        try:
+            await step(pipeline, item)
+            log.info("  [#%s] %s ✓", ghazal_num, name)
+            await out_q.put(item)
+        except Exception as e:
+            # Drop the ghazal from later stages, like translate_corpus does
+            log.error("  [#%s] %s ✗ Error: %s", ghazal_num, name, e)
+        finally:
+            in_q.task_done()
+
+
+async def run_staged(pipeline: TranslationPipeline, ghazals: list[Ghazal],
+                     workers: int = DEFAULT_WORKERS) -> list:
+    """
+    Run all ghazals through the four passes with overlapping stages.
+
+    Returns TranslationResults in input order; ghazals that failed in any
+    stage are omitted.
+    """
+    queues = [asyncio.Queue() for _ in range(len(STAGES) + 1)]
+    tasks = [
+        asyncio.create_task(_stage_worker(pipeline, name, step, queues[i], queues[i + 1]))
+        for i, (name, step) in enumerate(STAGES)
+        for _ in range(workers)
+    ]
+
+    for position, ghazal in enumerate(ghazals):
+        queues[0].put_nowait({"position": position, "ghazal": ghazal})
+
+    # Stages drain in order: once stage N's queue is empty and all its items
+    # are processed, nothing more can arrive at stage N+1 from upstream.
+    for q in queues[:-1]:
+        await q.join()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    done = []
+    while not queues[-1].empty():
+        done.append(queues[-1].get_nowait())
+    done.sort(key=lambda item: item["position"])
+
+    return [
+        pipeline.build_result(item["ghazal"], item["analysis"], item["literal"],
+                              item["refined"], item["qa"])
+        for item in done
+    ]
+
+
+def translate_corpus_staged(input_file: str, output_file: str, limit: Optional[int] = None,
+                            workers: int = DEFAULT_WORKERS,
+                            requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                            force_qa: bool = False, use_cache: bool = True,
+                            cache_path: Optional[str] = None):
+    """Translate a corpus of ghazals using the staged async orchestrator."""
+    with open(input_file, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    pipeline = TranslationPipeline(requests_per_minute=requests_per_minute, force_qa=force_qa,
+                                   cache=AgentCache(cache_path) if use_cache else NullCache())
+    # Per-call progress lines would interleave across workers
+    pipeline.verbose = False
+
+    ghazals = data["ghazals"][:limit] if limit else data["ghazals"]
+    ghazals = [Ghazal.from_dict(g) for g in ghazals]
+    results = asyncio.run(run_staged(pipeline, ghazals, workers))
+
+    save_translations(data, [r.to_dict() for r in results], output_file)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Translate Divan-e Kabir ghazals with overlapping pipeline stages")
+    parser.add_argument("--input", "-i", default="sample_ghazals.json")
+    parser.add_argument("--output", "-o", default="pipeline_translations.json")
+    parser.add_argument("--limit", "-l", type=int, help="Limit number of ghazals")
+    parser.add_argument("--workers", "-w", type=int, default=DEFAULT_WORKERS,
+                        help="Concurrent LLM calls per pass")
+    parser.add_argument("--rpm", type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Maximum LLM requests per minute across all passes")
+    parser.add_argument("--force-qa", action="store_true",
+                        help="Run QA even when the Stylist reports high confidence")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Call the API for every pass, ignoring cached responses")
+    parser.add_argument("--cache-path",
+                        help="Agent response cache (default: $DIVAN_CACHE or .agent_cache.sqlite)")
+    parser.add_argument("--api-key", "-k", help="Anthropic API key (or set ANTHROPIC_API_KEY env var)")
+
+    args = parser.parse_args()
+    # Pipeline progress and the final summary are logged, not printed
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.api_key:
+        os.environ["ANTHROPIC_API_KEY"] = args.api_key
+
+    if not os.environ.get("ANTHROPIC_API_KEY", "").strip():
+        print("Error: ANTHROPIC_API_KEY is not set or is empty.")
+        sys.exit(1)
+
+    translate_corpus_staged(args.input, args.output, args.limit, args.workers, args.rpm, args.force_qa,
+                            not args.no_cache, args.cache_path)
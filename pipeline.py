@@ -9,21 +9,73 @@ Divan-e Kabir Multi-Pass Translation Pipeline
 4. QA: Quality assurance check
 """
 
-import json
+import asyncio
+import logging
 import os
+import re
 import sys
+import time
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from typing import Optional
 import anthropic
+import orjson
+from aiolimiter import AsyncLimiter
 
-from agents.analyzer import ANALYZER_SYSTEM_PROMPT, get_analyzer_prompt
+from agents.analyzer import ANALYZER_SYSTEM_PROMPT, get_analyzer_prompt, get_analyzer_batch_prompt
 from agents.translator import TRANSLATOR_SYSTEM_PROMPT, get_translator_prompt
 from agents.stylist import STYLIST_SYSTEM_PROMPT, get_stylist_prompt
 from agents.qa import QA_SYSTEM_PROMPT, get_qa_prompt
+from agents.conversation import (
+    CONVERSATION_SYSTEM_PROMPT, TRANSLATOR_TURN, STYLIST_TURN, QA_TURN, get_conversation_opening
+)
+from agents.cache import AgentCache, NullCache, SemanticCache
+from agents.models import Ghazal
 
 
-@dataclass
+# Progress goes through logging: each record is written whole, so lines from
+# concurrent ghazals never split each other
+log = logging.getLogger(__name__)
+
+# Sustained LLM request budget for the async path (token bucket)
+DEFAULT_REQUESTS_PER_MINUTE = 50
+
+# Retries for 429/5xx; the SDK backs off and honours Retry-After itself
+LLM_MAX_RETRIES = 5
+
+# Ghazals translated at once by translate_corpus (each runs its 4 passes in order)
+DEFAULT_CONCURRENCY = 8
+
+# A ```json ... ``` fence the model sometimes wraps its answer in
+_FENCE_RE = re.compile(r"```(?:json)?\s*\n(.*?)\n```", re.DOTALL)
+
+# Seconds between status checks on a submitted Message Batch
+BATCH_POLL_INTERVAL = 30
+
+
+def _system_blocks(system_prompt: str) -> list:
+    """
+    The system prompt as a cacheable block.
+
+    The four system prompts are long and static, so marking them ephemeral
+    lets the API reuse the processed prefix instead of billing it per call.
+    """
+    return [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}]
+
+
+def _assistant_turn(result: dict) -> str:
+    """
+    A parsed response as it is replayed in the conversation history.
+
+    Re-serialized rather than raw, so a cached turn replays byte-for-byte
+    like a fresh one and later turns' cache keys stay stable.
+    """
+    if "parse_error" in result:
+        return result["raw_response"]
+    return orjson.dumps(result).decode("utf-8")
+
+
+@dataclass(slots=True)
 class TranslationResult:
     """Complete translation result from the pipeline."""
     ghazal_id: str
@@ -40,83 +92,171 @@ class TranslationResult:
     metadata: dict
 
     def to_dict(self):
-        return asdict(self)
+        # Shallow on purpose: the pass outputs are already plain, JSON-decoded
+        # dicts, so asdict's recursive deep copy would only duplicate them
+        return {
+            "ghazal_id": self.ghazal_id,
+            "ghazal_number": self.ghazal_number,
+            "persian_text": self.persian_text,
+            "analysis": self.analysis,
+            "literal_translation": self.literal_translation,
+            "refined_translation": self.refined_translation,
+            "qa_result": self.qa_result,
+            "final_translation": self.final_translation,
+            "scholarly_notes": self.scholarly_notes,
+            "confidence": self.confidence,
+            "needs_review": self.needs_review,
+            "metadata": self.metadata,
+        }
 
 
 class TranslationPipeline:
     """Multi-pass translation pipeline for Divan-e Kabir."""
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                 semantic_cache: Optional[SemanticCache] = None,
+                 requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 force_qa: bool = False, cache: Optional[AgentCache] = None):
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY")
         if not self.api_key:
             raise ValueError("ANTHROPIC_API_KEY required")
 
         self.client = anthropic.Anthropic(api_key=self.api_key)
+        self.async_client = anthropic.AsyncAnthropic(api_key=self.api_key, max_retries=LLM_MAX_RETRIES)
+        # Concurrency alone doesn't bound requests/minute; this does, shared by all workers
+        self.llm_limiter = AsyncLimiter(requests_per_minute, 60)
         self.model = model
         self.verbose = True
-
-    def _call_agent(self, system_prompt: str, user_prompt: str, agent_name: str) -> dict:
+        self.cache = cache if cache is not None else AgentCache()
+        # Optional: reuse Analyzer output across near-duplicate ghazals
+        self.semantic_cache = semantic_cache
+        # Run QA even when the Stylist reports high confidence (calibration runs)
+        self.force_qa = force_qa
+
+    def _call_agent(self, system_prompt: str, user_prompt: str, agent_name: str,
+                    max_tokens: int = 4000) -> dict:
         """Call an agent and parse JSON response."""
-        if self.verbose:
-            print(f"  Running {agent_name}...", end=" ", flush=True)
+        key = self.cache.make_key(self.model, system_prompt, user_prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            if self.verbose:
+                log.info("  %s ✓ (cached)", agent_name)
+            return cached
 
         try:
             response = self.client.messages.create(
                 model=self.model,
-                max_tokens=4000,
-                system=system_prompt,
+                max_tokens=max_tokens,
+                system=_system_blocks(system_prompt),
                 messages=[{"role": "user", "content": user_prompt}]
             )
-
-            text = response.content[0].text
-
-            # Try to parse as JSON
-            # Sometimes the model wraps in ```json ... ```
-            if text.startswith("```"):
-                # Extract JSON from code block
-                lines = text.split("\n")
-                json_lines = []
-                in_block = False
-                for line in lines:
-                    if line.startswith("```") and not in_block:
-                        in_block = True
-                        continue
-                    elif line.startswith("```") and in_block:
-                        break
-                    elif in_block:
-                        json_lines.append(line)
-                text = "\n".join(json_lines)
-
-            result = json.loads(text)
+        except Exception as e:
             if self.verbose:
-                print("✓")
-            return result
+                log.info("  %s ✗ Error: %s", agent_name, e)
+            raise
 
-        except json.JSONDecodeError as e:
+        return self._store_agent_response(key, response.content[0].text, agent_name)
+
+    async def acall_agent(self, system_prompt: str, user_prompt: str, agent_name: str) -> dict:
+        """
+        Run one agent pass asynchronously and return its parsed JSON response.
+
+        The async counterpart of the sync pass: it goes through the same
+        response cache and rate limit. Part of the API the staged
+        orchestrator drives each pass with.
+        """
+        key = self.cache.make_key(self.model, system_prompt, user_prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        await self.llm_limiter.acquire()
+        # Stream so the body downloads as it is generated; the JSON is decoded
+        # in one orjson call once the final token arrives
+        chunks = []
+        async with self.async_client.messages.stream(
+            model=self.model,
+            max_tokens=4000,
+            system=_system_blocks(system_prompt),
+            messages=[{"role": "user", "content": user_prompt}]
+        ) as stream:
+            async for text in stream.text_stream:
+                chunks.append(text)
+
+        return self._store_agent_response(key, "".join(chunks), agent_name)
+
+    def _store_agent_response(self, key: str, text: str, agent_name: str) -> dict:
+        """Parse a response and cache it, unless it failed to parse."""
+        result = self._parse_agent_response(text)
+        # A parse failure may be transient; let the next run retry it
+        if "parse_error" in result:
             if self.verbose:
-                print(f"⚠ JSON parse error")
+                log.info("  %s ⚠ JSON parse error", agent_name)
+        else:
+            self.cache.set(key, result)
+            if self.verbose:
+                log.info("  %s ✓", agent_name)
+        return result
+
+    def _parse_agent_response(self, text: str) -> dict:
+        """Parse an agent's JSON response, tolerating a ```json fence."""
+        try:
+            # Sometimes the model wraps in ```json ... ```. Only a response that
+            # opens with a fence is unwrapped: a fence inside a JSON string
+            # value is content, and the prefix test spares the regex otherwise
+            stripped = text.lstrip()
+            if stripped.startswith("```"):
+                match = _FENCE_RE.match(stripped)
+                if match:
+                    text = match.group(1)
+
+            return orjson.loads(text)
+
+        except orjson.JSONDecodeError as e:
             # Return the raw text wrapped in a dict
             return {"raw_response": text, "parse_error": str(e)}
-        except Exception as e:
+
+    def analyze_batch(self, ghazals: list[Ghazal]) -> list:
+        """
+        Run the Analyzer pass on several ghazals with a single request.
+
+        Returns one analysis per ghazal, or None for every ghazal if the batch
+        response could not be split back up (callers then analyze singly).
+        """
+        response = self._call_agent(
+            ANALYZER_SYSTEM_PROMPT,
+            get_analyzer_batch_prompt(ghazals),
+            f"Analyzer (batch of {len(ghazals)})",
+            # Non-streaming requests much above this are rejected by the SDK
+            max_tokens=min(4000 * len(ghazals), 16000)
+        )
+
+        analyses = response.get("analyses")
+        if not isinstance(analyses, list) or len(analyses) != len(ghazals):
             if self.verbose:
-                print(f"✗ Error: {e}")
-            raise
+                log.info("  ⚠ Batch analysis malformed; falling back to per-ghazal analysis")
+            return [None] * len(ghazals)
+        return analyses
 
-    def translate_ghazal(self, ghazal: dict) -> TranslationResult:
+    def translate_ghazal(self, ghazal: Ghazal, analysis: Optional[dict] = None) -> TranslationResult:
         """
         Run the full 4-pass pipeline on a single ghazal.
+
+        If `analysis` is given (e.g. from analyze_batch), pass 1 is skipped.
         """
-        ghazal_num = ghazal.get("number", "?")
-        print(f"\n{'='*60}")
-        print(f"Translating Ghazal #{ghazal_num}")
-        print(f"{'='*60}")
+        ghazal_num = ghazal.number
+        log.info("\n%s\nTranslating Ghazal #%s\n%s", "=" * 60, ghazal_num, "=" * 60)
 
         # Pass 1: Analysis
-        analysis = self._call_agent(
-            ANALYZER_SYSTEM_PROMPT,
-            get_analyzer_prompt(ghazal),
-            "Analyzer"
-        )
+        if analysis is None:
+            analysis = self.semantic_lookup(ghazal)
+        if analysis is None:
+            analysis = self._call_agent(
+                ANALYZER_SYSTEM_PROMPT,
+                get_analyzer_prompt(ghazal),
+                "Analyzer"
+            )
+            self.semantic_store(ghazal, analysis)
 
         # Pass 2: Literal Translation
         literal = self._call_agent(
@@ -135,12 +275,292 @@ class TranslationPipeline:
 
         # Pass 4: QA Check
         refined_for_qa = refined.get("refined_translation", refined)
-        qa = self._call_agent(
-            QA_SYSTEM_PROMPT,
-            get_qa_prompt(ghazal, analysis, literal_for_stylist, refined_for_qa),
-            "QA"
+        qa = self.qa_shortcut(refined)
+        if qa is None:
+            qa = self._call_agent(
+                QA_SYSTEM_PROMPT,
+                get_qa_prompt(ghazal, analysis, literal_for_stylist, refined_for_qa),
+                "QA"
+            )
+
+        result = self.build_result(ghazal, analysis, literal, refined, qa)
+
+        # Print summary
+        self._print_summary(result)
+
+        return result
+
+    async def atranslate_ghazal(self, ghazal: Ghazal, analysis: Optional[dict] = None) -> TranslationResult:
+        """
+        Async variant of translate_ghazal, for running many ghazals at once.
+
+        The four passes still run in order; only the network waits overlap
+        with those of other ghazals. Prints the summary once, when done.
+        """
+        # Pass 1: Analysis
+        if analysis is None:
+            analysis = self.semantic_lookup(ghazal)
+        if analysis is None:
+            analysis = await self.acall_agent(
+                ANALYZER_SYSTEM_PROMPT,
+                get_analyzer_prompt(ghazal),
+                "Analyzer"
+            )
+            self.semantic_store(ghazal, analysis)
+
+        # Pass 2: Literal Translation
+        literal = await self.acall_agent(
+            TRANSLATOR_SYSTEM_PROMPT,
+            get_translator_prompt(ghazal, analysis),
+            "Translator"
+        )
+
+        # Pass 3: Stylistic Refinement
+        literal_for_stylist = literal.get("literal_translation", literal)
+        refined = await self.acall_agent(
+            STYLIST_SYSTEM_PROMPT,
+            get_stylist_prompt(ghazal, analysis, literal_for_stylist),
+            "Stylist"
         )
 
+        # Pass 4: QA Check
+        refined_for_qa = refined.get("refined_translation", refined)
+        qa = self.qa_shortcut(refined)
+        if qa is None:
+            qa = await self.acall_agent(
+                QA_SYSTEM_PROMPT,
+                get_qa_prompt(ghazal, analysis, literal_for_stylist, refined_for_qa),
+                "QA"
+            )
+
+        result = self.build_result(ghazal, analysis, literal, refined, qa)
+
+        log.info("\n%s\nTranslated Ghazal #%s\n%s", "=" * 60, ghazal.number, "=" * 60)
+        self._print_summary(result)
+
+        return result
+
+    def _run_batch_pass(self, agent_name: str, system_prompt: str, prompts: dict) -> dict:
+        """
+        Run one pass over many ghazals as a single Message Batch.
+
+        `prompts` maps custom_id -> user prompt; returns custom_id -> parsed
+        response. Cached responses are answered locally and never submitted.
+        Blocks until the batch has ended.
+        """
+        results = {}
+        keys = {}
+        requests = []
+        for custom_id, user_prompt in prompts.items():
+            key = self.cache.make_key(self.model, system_prompt, user_prompt)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[custom_id] = cached
+                continue
+            keys[custom_id] = key
+            requests.append({
+                "custom_id": custom_id,
+                "params": {
+                    "model": self.model,
+                    "max_tokens": 4000,
+                    "system": _system_blocks(system_prompt),
+                    "messages": [{"role": "user", "content": user_prompt}]
+                }
+            })
+
+        log.info("  %s: %d cached, %d to submit", agent_name, len(results), len(requests))
+        if not requests:
+            return results
+
+        batch = self.client.messages.batches.create(requests=requests)
+        log.info("  %s: waiting on batch %s...", agent_name, batch.id)
+        while batch.processing_status != "ended":
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type != "succeeded":
+                log.warning("  %s: request %s %s", agent_name, entry.custom_id, entry.result.type)
+                continue
+            text = entry.result.message.content[0].text
+            results[entry.custom_id] = self._store_agent_response(keys[entry.custom_id], text, agent_name)
+        return results
+
+    def translate_batch(self, ghazals: list[Ghazal], analyses: Optional[list] = None) -> list:
+        """
+        Run the 4-pass pipeline over many ghazals with the Message Batches API.
+
+        Each pass is one batch over every ghazal that survived the previous
+        pass, so the passes still run in order. Batches are billed at half
+        the live rate but can take hours; suited to overnight corpus runs.
+        Ghazals whose request fails in any pass are dropped.
+        """
+        # custom_id is the ghazal's position, which is unique even if numbers repeat
+        by_id = {str(i): g for i, g in enumerate(ghazals)}
+        analyses = analyses or [None] * len(ghazals)
+
+        analysis = {cid: a for cid, a in zip(by_id, analyses) if a is not None}
+        for cid, ghazal in by_id.items():
+            if cid not in analysis:
+                cached = self.semantic_lookup(ghazal)
+                if cached is not None:
+                    analysis[cid] = cached
+
+        fresh = self._run_batch_pass("Analyzer", ANALYZER_SYSTEM_PROMPT, {
+            cid: get_analyzer_prompt(g) for cid, g in by_id.items() if cid not in analysis
+        })
+        for cid, a in fresh.items():
+            self.semantic_store(by_id[cid], a)
+        analysis.update(fresh)
+
+        literal = self._run_batch_pass("Translator", TRANSLATOR_SYSTEM_PROMPT, {
+            cid: get_translator_prompt(by_id[cid], analysis[cid]) for cid in analysis
+        })
+
+        literal_for_stylist = {cid: lit.get("literal_translation", lit) for cid, lit in literal.items()}
+        refined = self._run_batch_pass("Stylist", STYLIST_SYSTEM_PROMPT, {
+            cid: get_stylist_prompt(by_id[cid], analysis[cid], literal_for_stylist[cid])
+            for cid in literal
+        })
+
+        qa = {}
+        for cid, ref in refined.items():
+            shortcut = self.qa_shortcut(ref)
+            if shortcut is not None:
+                qa[cid] = shortcut
+        qa.update(self._run_batch_pass("QA", QA_SYSTEM_PROMPT, {
+            cid: get_qa_prompt(by_id[cid], analysis[cid], literal_for_stylist[cid],
+                               ref.get("refined_translation", ref))
+            for cid, ref in refined.items() if cid not in qa
+        }))
+
+        results = []
+        for cid, ghazal in by_id.items():
+            if cid not in qa:
+                log.error("Error translating ghazal %s: a batch request failed", ghazal.number)
+                continue
+            results.append(self.build_result(ghazal, analysis[cid], literal[cid], refined[cid], qa[cid]))
+        return results
+
+    def translate_ghazal_conversation(self, ghazal: Ghazal, analysis: Optional[dict] = None) -> TranslationResult:
+        """
+        Run the 4 passes as turns of a single conversation.
+
+        Each turn re-sends the history, but as a cached prefix, so the
+        Persian text and earlier outputs are processed once rather than
+        rebuilt into every pass's prompt. See agents/conversation.py.
+        """
+        ghazal_num = ghazal.number
+        log.info("\n%s\nTranslating Ghazal #%s (conversation)\n%s", "=" * 60, ghazal_num, "=" * 60)
+
+        messages = [{"role": "user", "content": get_conversation_opening(ghazal)}]
+
+        # Pass 1: Analysis (a known analysis becomes the assistant's first turn)
+        if analysis is None:
+            analysis = self.semantic_lookup(ghazal)
+        if analysis is None:
+            analysis = self._converse(messages, "Analyzer")
+            self.semantic_store(ghazal, analysis)
+        else:
+            messages.append({"role": "assistant", "content": _assistant_turn(analysis)})
+
+        # Passes 2-4 only name the next role; the context is already in the history
+        messages.append({"role": "user", "content": TRANSLATOR_TURN})
+        literal = self._converse(messages, "Translator")
+
+        messages.append({"role": "user", "content": STYLIST_TURN})
+        refined = self._converse(messages, "Stylist")
+
+        qa = self.qa_shortcut(refined)
+        if qa is None:
+            messages.append({"role": "user", "content": QA_TURN})
+            qa = self._converse(messages, "QA")
+
+        result = self.build_result(ghazal, analysis, literal, refined, qa)
+        self._print_summary(result)
+        return result
+
+    def _converse(self, messages: list, agent_name: str) -> dict:
+        """
+        Send the conversation so far and append the assistant's reply to it.
+
+        The newest user turn is marked as a cache breakpoint, so the next
+        turn's request reads everything up to here from the prompt cache.
+        """
+        key = self.cache.make_key(self.model, CONVERSATION_SYSTEM_PROMPT,
+                                  "\0".join(m["content"] for m in messages))
+        result = self.cache.get(key)
+        if result is not None:
+            if self.verbose:
+                log.info("  %s ✓ (cached)", agent_name)
+        else:
+            last = messages[-1]
+            request = messages[:-1] + [{
+                "role": "user",
+                "content": [{"type": "text", "text": last["content"],
+                             "cache_control": {"type": "ephemeral"}}]
+            }]
+            try:
+                response = self.client.messages.create(
+                    model=self.model,
+                    max_tokens=4000,
+                    system=_system_blocks(CONVERSATION_SYSTEM_PROMPT),
+                    messages=request
+                )
+            except Exception as e:
+                if self.verbose:
+                    log.info("  %s ✗ Error: %s", agent_name, e)
+                raise
+            result = self._store_agent_response(key, response.content[0].text, agent_name)
+
+        messages.append({"role": "assistant", "content": _assistant_turn(result)})
+        return result
+
+    def qa_shortcut(self, refined: dict) -> Optional[dict]:
+        """
+        A stand-in QA result when pass 4 can be skipped, else None.
+
+        Skipped only if the Stylist rated its own output high confidence and
+        that output is well formed; force_qa turns this off.
+        """
+        if self.force_qa:
+            return None
+        refined_translation = refined.get("refined_translation")
+        if not isinstance(refined_translation, dict):
+            return None
+        if refined_translation.get("self_confidence") != "high":
+            return None
+        if not refined_translation.get("verses") or not refined_translation.get("full_text"):
+            return None
+
+        if self.verbose:
+            log.info("  QA skipped (Stylist confident)")
+        return {
+            "confidence": "high",
+            "flags_for_human_review": False,
+            "overall_issues": [],
+            "qa_skipped": "Stylist self-reported high confidence"
+        }
+
+    def semantic_lookup(self, ghazal: Ghazal) -> Optional[dict]:
+        """Return a cached analysis of a near-identical ghazal, if any."""
+        if self.semantic_cache is None:
+            return None
+        analysis = self.semantic_cache.lookup(ghazal.persian_text())
+        if analysis is not None and self.verbose:
+            log.info("  Analyzer ✓ (semantic cache)")
+        return analysis
+
+    def semantic_store(self, ghazal: Ghazal, analysis: dict):
+        """Remember an analysis for near-identical ghazals (no-op without a semantic cache)."""
+        if self.semantic_cache is not None and "parse_error" not in analysis:
+            self.semantic_cache.add(ghazal.persian_text(), analysis)
+
+    def build_result(self, ghazal: Ghazal, analysis: dict, literal: dict,
+                     refined: dict, qa: dict) -> TranslationResult:
+        """Assemble the outputs of all four passes into a TranslationResult."""
+        ghazal_num = ghazal.number
+
         # Extract final translation
         final_text = self._extract_final_translation(refined)
         notes = self._compile_scholarly_notes(analysis, literal)
@@ -149,10 +569,10 @@ class TranslationPipeline:
         confidence = qa.get("confidence", "medium")
         needs_review = qa.get("flags_for_human_review", confidence == "low")
 
-        result = TranslationResult(
+        return TranslationResult(
             ghazal_id=f"F-{ghazal_num}",
             ghazal_number=ghazal_num,
-            persian_text=ghazal["verses"],
+            persian_text=[v.to_dict() for v in ghazal.verses],
             analysis=analysis,
             literal_translation=literal,
             refined_translation=refined,
@@ -168,11 +588,6 @@ class TranslationPipeline:
             }
         )
 
-        # Print summary
-        self._print_summary(result)
-
-        return result
-
     def _extract_final_translation(self, refined: dict) -> str:
         """Extract the final translation text from refined output."""
         if "refined_translation" in refined:
@@ -189,76 +604,212 @@ class TranslationPipeline:
 
     def _compile_scholarly_notes(self, analysis: dict, literal: dict) -> str:
         """Compile scholarly notes from analysis."""
+        # One comprehension per section, joined once at the end
         notes = []
 
         # Quranic allusions
         if analysis.get("quranic_allusions"):
             notes.append("**Quranic Allusions:**")
-            for a in analysis["quranic_allusions"]:
-                notes.append(f"- {a.get('reference', '?')}: {a.get('meaning', a.get('rumi_usage', ''))}")
+            notes.extend([f"- {a.get('reference', '?')}: {a.get('meaning', a.get('rumi_usage', ''))}"
+                          for a in analysis["quranic_allusions"]])
 
         # Sufi terminology
         if analysis.get("sufi_terminology"):
             notes.append("\n**Sufi Terminology:**")
-            for t in analysis["sufi_terminology"]:
-                notes.append(f"- *{t.get('term', '')}* ({t.get('persian', '')}): {t.get('meaning_in_context', '')}")
+            notes.extend([f"- *{t.get('term', '')}* ({t.get('persian', '')}): {t.get('meaning_in_context', '')}"
+                          for t in analysis["sufi_terminology"]])
 
         # Ambiguities
         if analysis.get("ambiguities"):
             notes.append("\n**Deliberate Ambiguities:**")
-            for a in analysis["ambiguities"]:
-                readings = ", ".join(a.get("possible_readings", []))
-                notes.append(f"- \"{a.get('phrase', '')}\": {readings}")
+            notes.extend([f"- \"{a.get('phrase', '')}\": {', '.join(a.get('possible_readings', []))}"
+                          for a in analysis["ambiguities"]])
 
         # Wordplay
         if analysis.get("wordplay"):
             notes.append("\n**Wordplay (Lost in Translation):**")
-            for w in analysis["wordplay"]:
-                meanings = ", ".join(w.get("meanings", []))
-                notes.append(f"- *{w.get('word', '')}*: {meanings}")
+            notes.extend([f"- *{w.get('word', '')}*: {', '.join(w.get('meanings', []))}"
+                          for w in analysis["wordplay"]])
 
         # Translation notes
         if literal.get("translation_notes"):
             notes.append("\n**Translation Notes:**")
-            for n in literal["translation_notes"]:
-                notes.append(f"- Verse {n.get('verse', '?')}: {n.get('note', '')}")
+            notes.extend([f"- Verse {n.get('verse', '?')}: {n.get('note', '')}"
+                          for n in literal["translation_notes"]])
 
         return "\n".join(notes) if notes else ""
 
     def _print_summary(self, result: TranslationResult):
-        """Print a summary of the translation."""
-        print(f"\n--- Translation Result ---")
-        print(f"Confidence: {result.confidence.upper()}")
+        """Log a summary of the translation, as a single record."""
+        lines = ["\n--- Translation Result ---", f"Confidence: {result.confidence.upper()}"]
         if result.needs_review:
-            print(f"⚠️  FLAGGED FOR HUMAN REVIEW")
+            lines.append("⚠️  FLAGGED FOR HUMAN REVIEW")
 
-        print(f"\n--- Final Translation ---")
-        print(result.final_translation)
+        lines.extend(("\n--- Final Translation ---", result.final_translation))
 
         if result.qa_result.get("overall_issues"):
-            print(f"\n--- QA Issues ---")
-            for issue in result.qa_result["overall_issues"]:
-                print(f"  - {issue}")
-
-
-def translate_corpus(input_file: str, output_file: str, limit: Optional[int] = None):
-    """Translate a corpus of ghazals."""
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+            lines.append("\n--- QA Issues ---")
+            lines.extend([f"  - {issue}" for issue in result.qa_result["overall_issues"]])
+
+        log.info("\n".join(lines))
+
+
+class TranslationWriter:
+    """
+    Appends finished translations to a JSON Lines file, one object per line.
+
+    Each line is flushed as it is written, so a crash keeps every ghazal
+    finished so far. Summary counts are kept as running totals.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.count = 0
+        self.stats = {"high": 0, "medium": 0, "low": 0, "review": 0}
+
+    def write(self, result: dict):
+        self.file.write(orjson.dumps(result) + b"\n")
+        self.file.flush()
+        self.count += 1
+        _tally(self.stats, result)
+
+    def close(self):
+        self.file.close()
+
+
+def _tally(stats: dict, result: dict):
+    """Add one translation to the running confidence/review counts."""
+    for level in ("high", "medium", "low"):
+        if result["confidence"] == level:
+            stats[level] += 1
+    if result["needs_review"]:
+        stats["review"] += 1
+
+
+def _print_stats(stats: dict, count: int, output_file: str):
+    log.info("\n%s\nSaved %d translations to %s\nConfidence: %d high, %d medium, %d low\nFlagged for review: %d",
+             "=" * 60, count, output_file, stats["high"], stats["medium"], stats["low"], stats["review"])
+
+
+async def _translate_concurrently(pipeline: TranslationPipeline, ghazals: list[Ghazal],
+                                  analyses: list, concurrency: int, writer: TranslationWriter):
+    """Translate ghazals with at most `concurrency` in flight, writing each as it finishes."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def translate_one(ghazal: Ghazal, analysis: Optional[dict]):
+        async with sem:
+            try:
+                result = await pipeline.atranslate_ghazal(ghazal, analysis)
+            except Exception as e:
+                log.error("Error translating ghazal %s: %s", ghazal.number, e)
+                return
+        writer.write(result.to_dict())
+
+    await asyncio.gather(*(translate_one(g, a) for g, a in zip(ghazals, analyses)))
+
+
+def translate_corpus(input_file: str, output_file: str, limit: Optional[int] = None,
+                     analyzer_batch_size: int = 1, semantic_cache: bool = False,
+                     concurrency: int = DEFAULT_CONCURRENCY, batch: bool = False,
+                     conversation: bool = False, force_qa: bool = False,
+                     use_cache: bool = True, cache_path: Optional[str] = None):
+    """
+    Translate a corpus of ghazals.
+
+    With analyzer_batch_size > 1, pass 1 analyzes that many ghazals per
+    request so the Analyzer system prompt is sent once per batch. With
+    semantic_cache, analyses are reused across near-duplicate ghazals.
+    With concurrency > 1, that many ghazals are translated at once. With
+    batch, every pass goes through the Message Batches API instead. With
+    conversation, each ghazal's passes are turns of one conversation; this
+    runs one ghazal at a time. QA is skipped for ghazals the Stylist rates
+    high confidence unless force_qa is set. Agent responses are cached in
+    cache_path (default: $DIVAN_CACHE, else .agent_cache.sqlite) unless
+    use_cache is False.
+
+    Translations are streamed to a JSON Lines file as they finish. If
+    output_file is not itself .jsonl, that file is written alongside it and
+    wrapped into the usual single-object format once the run completes.
+    """
+    with open(input_file, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    pipeline = TranslationPipeline(semantic_cache=SemanticCache() if semantic_cache else None,
+                                   force_qa=force_qa,
+                                   cache=AgentCache(cache_path) if use_cache else NullCache())
 
-    pipeline = TranslationPipeline()
-
-    results = []
     ghazals = data["ghazals"][:limit] if limit else data["ghazals"]
-
-    for ghazal in ghazals:
-        try:
-            result = pipeline.translate_ghazal(ghazal)
-            results.append(result.to_dict())
-        except Exception as e:
-            print(f"Error translating ghazal {ghazal.get('number', '?')}: {e}")
-            continue
-
+    ghazals = [Ghazal.from_dict(g) for g in ghazals]
+
+    if pipeline.semantic_cache is not None:
+        # One batched embedding pass instead of one encode() per ghazal
+        pipeline.semantic_cache.prime([g.persian_text() for g in ghazals])
+
+    # Pass 1 for batched ghazals up front; None means analyze individually
+    analyses = [None] * len(ghazals)
+    for start in range(0, len(ghazals), analyzer_batch_size):
+        group = ghazals[start:start + analyzer_batch_size]
+        if len(group) > 1:
+            try:
+                analyses[start:start + len(group)] = pipeline.analyze_batch(group)
+            except Exception as e:
+                log.error("Error analyzing batch starting at ghazal %s: %s", group[0].number, e)
+
+    jsonl_file = output_file if output_file.endswith(".jsonl") else output_file + ".jsonl"
+    writer = TranslationWriter(jsonl_file)
+    try:
+        if batch:
+            pipeline.verbose = False
+            for result in pipeline.translate_batch(ghazals, analyses):
+                writer.write(result.to_dict())
+        elif concurrency > 1 and not conversation:
+            # Per-call lines name only the pass, which is ambiguous across ghazals
+            pipeline.verbose = False
+            asyncio.run(_translate_concurrently(pipeline, ghazals, analyses, concurrency, writer))
+        else:
+            translate = pipeline.translate_ghazal_conversation if conversation else pipeline.translate_ghazal
+            for ghazal, analysis in zip(ghazals, analyses):
+                try:
+                    result = translate(ghazal, analysis)
+                    writer.write(result.to_dict())
+                except Exception as e:
+                    log.error("Error translating ghazal %s: %s", ghazal.number, e)
+                    continue
+    finally:
+        writer.close()
+
+    if pipeline.semantic_cache is not None:
+        pipeline.semantic_cache.save()
+
+    if jsonl_file == output_file:
+        _print_stats(writer.stats, writer.count, output_file)
+    else:
+        jsonl_to_wrapped(jsonl_file, data, output_file, order=[g.number for g in ghazals])
+        os.remove(jsonl_file)
+
+
+def jsonl_to_wrapped(jsonl_file: str, data: dict, output_file: str, order: Optional[list] = None):
+    """
+    Wrap a JSON Lines file of translations in the corpus metadata.
+
+    Lines are in completion order; pass the corpus's ghazal numbers as
+    `order` to restore input order.
+    """
+    with open(jsonl_file, 'rb') as f:
+        results = [orjson.loads(line) for line in f if line.strip()]
+
+    if order is not None:
+        position = {}
+        for i, number in enumerate(order):
+            position.setdefault(number, i)
+        results.sort(key=lambda r: position.get(r["ghazal_number"], len(order)))
+
+    save_translations(data, results, output_file)
+
+
+def save_translations(data: dict, results: list, output_file: str):
+    """Write translation results (as dicts) alongside the corpus metadata."""
     output = {
         "source": data.get("source", "Divan-e Kabir"),
         "edition": data.get("edition", "Unknown"),
@@ -268,20 +819,15 @@ def translate_corpus(input_file: str, output_file: str, limit: Optional[int] = N
         "translations": results
     }
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
-
-    print(f"\n{'='*60}")
-    print(f"Saved {len(results)} translations to {output_file}")
-
-    # Summary stats
-    high = sum(1 for r in results if r["confidence"] == "high")
-    medium = sum(1 for r in results if r["confidence"] == "medium")
-    low = sum(1 for r in results if r["confidence"] == "low")
-    review = sum(1 for r in results if r["needs_review"])
+    # orjson writes UTF-8 bytes directly (no ASCII escaping of Persian text)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
-    print(f"Confidence: {high} high, {medium} medium, {low} low")
-    print(f"Flagged for review: {review}")
+    # Summary stats, in one pass over the results
+    stats = {"high": 0, "medium": 0, "low": 0, "review": 0}
+    for r in results:
+        _tally(stats, r)
+    _print_stats(stats, len(results), output_file)
 
 
 if __name__ == "__main__":
@@ -291,9 +837,26 @@ if __name__ == "__main__":
     parser.add_argument("--input", "-i", default="sample_ghazals.json")
     parser.add_argument("--output", "-o", default="pipeline_translations.json")
     parser.add_argument("--limit", "-l", type=int, help="Limit number of ghazals")
+    parser.add_argument("--analyzer-batch", "-b", type=int, default=1,
+                        help="Ghazals per Analyzer request (default: 1, no batching)")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Reuse analyses of near-duplicate ghazals (needs sentence-transformers, faiss-cpu)")
+    parser.add_argument("--concurrency", "-j", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Ghazals translated at once (1 = sequential, with per-pass progress)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit each pass as a Message Batch (half price, can take hours)")
+    parser.add_argument("--conversation", action="store_true",
+                        help="Run each ghazal's passes as turns of one conversation (sequential)")
+    parser.add_argument("--force-qa", action="store_true",
+                        help="Run QA even when the Stylist reports high confidence")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Call the API for every pass, ignoring cached responses")
+    parser.add_argument("--cache-path",
+                        help="Agent response cache (default: $DIVAN_CACHE or .agent_cache.sqlite)")
     parser.add_argument("--api-key", "-k", help="Anthropic API key (or set ANTHROPIC_API_KEY env var)")
 
     args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
 
     # Set API key from argument if provided
     if args.api_key:
@@ -308,4 +871,6 @@ if __name__ == "__main__":
         print("  2. Pass it as an argument: python pipeline.py --api-key 'your-key'")
         sys.exit(1)
 
-    translate_corpus(args.input, args.output, args.limit)
+    translate_corpus(args.input, args.output, args.limit, args.analyzer_batch, args.semantic_cache,
+                     args.concurrency, args.batch, args.conversation, args.force_qa,
+                     not args.no_cache, args.cache_path)
@@ -6,19 +6,60 @@ End-to-end system for translating Rumi's poetry using LLMs
 Usage:
     python translate.py --input sample_ghazals.json --output translations.json
     python translate.py --api-key YOUR_KEY --model claude-sonnet-4-20250514
+    python translate.py --output translations.jsonl   # one JSON object per line
 """
 
-import json
 import argparse
+import asyncio
+import functools
+import orjson
 import os
+import time
 from datetime import datetime
 from typing import Optional
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 # Import the prompts
 from translation_prompt import SYSTEM_PROMPT, format_ghazal_for_translation
+from agents.cache import AgentCache, SemanticCache
+from agents.models import Ghazal
 
-@dataclass
+# The SDK is optional: without it every translation falls back to the mock.
+# Checked once here rather than by a try/import on every call.
+try:
+    import anthropic
+    import httpx
+    _HAS_ANTHROPIC = True
+    # Raised once the SDK's own retries are exhausted (429, 5xx, connection errors)
+    _API_ERRORS = (anthropic.APIError,)
+except ImportError:
+    _HAS_ANTHROPIC = False
+    _API_ERRORS = ()
+
+# Ghazals translated at once by translate_collection
+DEFAULT_CONCURRENCY = 10
+
+# Ghazals scheduled per round; the next round starts once this one is written
+DEFAULT_BATCH_SIZE = 20
+
+# The SDK retries 429/5xx responses itself, backing off exponentially
+LLM_MAX_RETRIES = 5
+
+# Kept apart from the pipeline's semantic cache, which stores analyses
+TRANSLATION_SEMANTIC_CACHE_DIR = ".translation_semantic_cache"
+
+# Seconds between status checks while a Message Batch is processing
+BATCH_POLL_INTERVAL = 30
+
+# SYSTEM_PROMPT is identical on every call, so mark it cacheable and let the
+# API reuse the processed prefix; only the per-ghazal user prompt varies
+_SYSTEM_BLOCKS = [{"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+# Prompts estimated above this many input tokens are refused rather than sent.
+# No real ghazal comes close, so it only trips on malformed input.
+MAX_PROMPT_TOKENS = 150_000
+
+@dataclass(slots=True)
 class TranslatedGhazal:
     """Structured output for a translated ghazal."""
     number: int
@@ -32,46 +73,148 @@ class TranslatedGhazal:
     confidence: str  # high, medium, low
 
     def to_dict(self):
-        return asdict(self)
+        # Shallow on purpose: persian_text is the input's own verse list and is
+        # never mutated, so asdict's recursive deep copy would only duplicate it
+        return {
+            "number": self.number,
+            "meter": self.meter,
+            "rhyme": self.rhyme,
+            "persian_text": self.persian_text,
+            "english_translation": self.english_translation,
+            "scholarly_notes": self.scholarly_notes,
+            "translator_model": self.translator_model,
+            "translated_at": self.translated_at,
+            "confidence": self.confidence,
+        }
+
+
+class TranslationWriter:
+    """
+    Appends finished translations to a JSON Lines file, one object per line.
+
+    Each line is flushed as it is written, so a crash keeps every ghazal
+    finished so far.
+    """
 
+    def __init__(self, path: str):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.count = 0
 
-def translate_with_anthropic(persian_ghazal: dict, api_key: str, model: str = "claude-sonnet-4-20250514") -> str:
+    def write(self, translated: TranslatedGhazal | dict):
+        # orjson serializes the dataclass natively, without an asdict() copy
+        self.file.write(orjson.dumps(translated) + b"\n")
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+
+def translate_with_anthropic(persian_ghazal: dict, api_key: str, model: str = "claude-sonnet-4-20250514",
+                             cache: Optional[AgentCache] = None) -> str:
     """
     Translate a ghazal using the Anthropic API.
 
     In production, this calls the Claude API. For demo purposes,
     we provide a mock implementation that can be swapped out.
+    With a cache, a response for the same (model, prompt) is reused.
     """
-    try:
-        import anthropic
-        client = anthropic.Anthropic(api_key=api_key)
-
-        user_prompt = format_ghazal_for_translation(persian_ghazal)
-
-        message = client.messages.create(
-            model=model,
-            max_tokens=2000,
-            system=SYSTEM_PROMPT,
-            messages=[
-                {"role": "user", "content": user_prompt}
-            ]
-        )
-
-        return message.content[0].text
+    user_prompt = format_ghazal_for_translation(persian_ghazal)
+    key, cached = _cache_lookup(cache, model, user_prompt)
+    if cached is not None:
+        return cached
+    _check_prompt_size(persian_ghazal, user_prompt)
 
-    except ImportError:
+    if not _HAS_ANTHROPIC:
         print("Warning: anthropic package not installed. Using mock translation.")
         return mock_translate(persian_ghazal)
 
+    message = _sync_client(api_key).messages.create(
+        model=model,
+        max_tokens=2000,
+        system=_SYSTEM_BLOCKS,
+        messages=[
+            {"role": "user", "content": user_prompt}
+        ]
+    )
 
-def mock_translate(ghazal: dict) -> str:
+    return _cache_store(cache, key, message.content[0].text)
+
+
+@functools.lru_cache(maxsize=8)
+def _sync_client(api_key: str):
+    """One client per API key, so repeated calls reuse its connection pool."""
+    return anthropic.Anthropic(api_key=api_key, max_retries=LLM_MAX_RETRIES)
+
+
+async def translate_with_anthropic_async(persian_ghazal: dict, client,
+                                        model: str = "claude-sonnet-4-20250514",
+                                        cache: Optional[AgentCache] = None) -> str:
     """
-    Mock translation for demonstration when API is unavailable.
-    Returns a structured response showing the expected format.
+    Async variant of translate_with_anthropic.
+
+    Takes a shared anthropic.AsyncAnthropic client, so concurrent calls
+    reuse its connection pool.
+    """
+    user_prompt = format_ghazal_for_translation(persian_ghazal)
+    key, cached = _cache_lookup(cache, model, user_prompt)
+    if cached is not None:
+        return cached
+    _check_prompt_size(persian_ghazal, user_prompt)
+
+    message = await client.messages.create(
+        model=model,
+        max_tokens=2000,
+        system=_SYSTEM_BLOCKS,
+        messages=[
+            {"role": "user", "content": user_prompt}
+        ]
+    )
+
+    return _cache_store(cache, key, message.content[0].text)
+
+
+def _estimate_tokens(text: str) -> int:
+    """
+    A deliberately high, local estimate of the tokens in text.
+
+    One token per two UTF-8 bytes over-counts English (about four
+    characters a token) and roughly matches Persian (two bytes a letter).
     """
-    # This provides realistic example output to demonstrate the pipeline
-    mock_translations = {
-        2114: """## Translation
+    return len(text.encode("utf-8")) // 2 + 1
+
+
+_SYSTEM_PROMPT_TOKENS = _estimate_tokens(SYSTEM_PROMPT)
+
+
+def _check_prompt_size(ghazal: dict, user_prompt: str) -> int:
+    """Return the estimated input tokens for a request; raise ValueError if over MAX_PROMPT_TOKENS."""
+    tokens = _SYSTEM_PROMPT_TOKENS + _estimate_tokens(user_prompt)
+    if tokens > MAX_PROMPT_TOKENS:
+        raise ValueError(f"Ghazal #{ghazal['number']}: prompt is ~{tokens} tokens, "
+                         f"over the {MAX_PROMPT_TOKENS} token limit")
+    return tokens
+
+
+def _cache_lookup(cache: Optional[AgentCache], model: str, user_prompt: str) -> tuple:
+    """Return (key, cached response text or None); the key is None without a cache."""
+    if cache is None:
+        return None, None
+    key = cache.make_key(model, SYSTEM_PROMPT, user_prompt)
+    entry = cache.get(key)
+    return key, entry["response"] if entry is not None else None
+
+
+def _cache_store(cache: Optional[AgentCache], key: Optional[str], response: str) -> str:
+    if cache is not None:
+        cache.set(key, {"response": response})
+    return response
+
+
+# Realistic example output to demonstrate the pipeline, built once at import
+_MOCK_TRANSLATIONS: dict[int, str] = {
+    2114: """## Translation
 
 **Verse 1:**
 O people who have gone on Hajj—where are you, where are you?
@@ -100,7 +243,7 @@ You become the master, the house, and the Kaaba itself.
 
 **Lost in Translation:** The Persian "در چه هوایید" (dar che hava'id) contains wordplay—"hava" means both "air/atmosphere" and "desire/whim," suggesting both physical wandering and scattered spiritual aspiration.""",
 
-        1173: """## Translation
+    1173: """## Translation
 
 **Verse 1:**
 Love is the soul of all souls, Love is the affection of all the affectionate,
@@ -128,7 +271,7 @@ The lover has neither body nor soul—for Love is all soul, it is He.
 
 **Lost in Translation:** The Persian maintains a hypnotic rhythm through repetition that cannot be fully captured in English.""",
 
-        462: """## Translation
+    462: """## Translation
 
 **Verse 1:**
 Someone said to me last night: "O friend,
@@ -154,7 +297,7 @@ His light is in every heart where the soul resides.
 
 **Sufi Relationship:** The relationship between Rumi and Shams exemplifies the murshid-murid (master-disciple) bond, though Rumi often positions Shams as the greater one. Their relationship scandalized conventional religious authorities of 13th-century Konya.""",
 
-        911: """## Translation
+    911: """## Translation
 
 **Verse 1:**
 What do I know of what I am intoxicated with? What do I know of what I am?
@@ -176,15 +319,12 @@ Before that stature, that stature like a tall cypress.
 - "Sarv" (سرو): Cypress—a common Persian poetic image for the beloved's tall, graceful stature.
 
 **Ecstatic Dissolution:** The stammering repetition ("heart given, heart given"; "that stature, that stature") mimics the speech of one overwhelmed by spiritual experience—the rational faculties failing in the face of encounter with the divine."""
-    }
-
-    if ghazal["number"] in mock_translations:
-        return mock_translations[ghazal["number"]]
+}
 
-    # Generic fallback
-    return f"""## Translation
+# Generic fallback for ghazals without a canned translation
+_GENERIC_FALLBACK = """## Translation
 
-[Translation would appear here for Ghazal #{ghazal['number']}]
+[Translation would appear here for Ghazal #{number}]
 
 ---
 
@@ -193,35 +333,62 @@ Before that stature, that stature like a tall cypress.
 This is a mock translation for demonstration purposes. In production, this would be generated by the Claude API with the full translation prompt."""
 
 
+def mock_translate(ghazal: dict) -> str:
+    """
+    Mock translation for demonstration when API is unavailable.
+    Returns a structured response showing the expected format.
+    """
+    cached = _MOCK_TRANSLATIONS.get(ghazal["number"])
+    if cached is not None:
+        return cached
+    return _GENERIC_FALLBACK.format(number=ghazal["number"])
+
+
 def parse_translation_response(response: str) -> tuple[str, str]:
     """
     Parse the LLM response into translation and notes sections.
     """
-    translation = ""
-    notes = ""
-
-    # Simple parsing based on expected headers
-    if "## Translation" in response and "## Scholarly Notes" in response:
-        parts = response.split("## Scholarly Notes")
-        translation = parts[0].replace("## Translation", "").strip()
-        notes = parts[1].strip() if len(parts) > 1 else ""
-    else:
+    # Simple parsing based on expected headers; partition finds the notes
+    # header in one scan and, unlike split, builds no list of parts
+    head, sep, tail = response.partition("## Scholarly Notes")
+    if not sep or "## Translation" not in response:
         # Fallback: treat whole response as translation
-        translation = response
-        notes = ""
+        return response, ""
 
-    return translation, notes
+    # Notes stop at a repeated header, as they did when this used split()
+    notes = tail.partition("## Scholarly Notes")[0]
+    return head.replace("## Translation", "").strip(), notes.strip()
 
 
-def translate_ghazal(ghazal: dict, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514") -> TranslatedGhazal:
+def translate_ghazal(ghazal: dict, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                     cache: Optional[AgentCache] = None) -> TranslatedGhazal:
     """
     Translate a single ghazal and return structured output.
     """
     if api_key:
-        raw_response = translate_with_anthropic(ghazal, api_key, model)
+        raw_response = translate_with_anthropic(ghazal, api_key, model, cache)
+    else:
+        raw_response = mock_translate(ghazal)
+
+    return _build_translated_ghazal(ghazal, raw_response, model if api_key else "mock")
+
+
+async def translate_ghazal_async(ghazal: dict, client=None,
+                                 model: str = "claude-sonnet-4-20250514",
+                                 cache: Optional[AgentCache] = None) -> TranslatedGhazal:
+    """
+    Async variant of translate_ghazal; without a client, uses the mock.
+    """
+    if client is not None:
+        raw_response = await translate_with_anthropic_async(ghazal, client, model, cache)
     else:
         raw_response = mock_translate(ghazal)
 
+    return _build_translated_ghazal(ghazal, raw_response, model if client is not None else "mock")
+
+
+def _build_translated_ghazal(ghazal: dict, raw_response: str, translator_model: str) -> TranslatedGhazal:
+    """Parse a raw response into the structured output for one ghazal."""
     translation, notes = parse_translation_response(raw_response)
 
     return TranslatedGhazal(
@@ -231,36 +398,262 @@ def translate_ghazal(ghazal: dict, api_key: Optional[str] = None, model: str = "
         persian_text=ghazal["verses"],
         english_translation=translation,
         scholarly_notes=notes,
-        translator_model=model if api_key else "mock",
+        translator_model=translator_model,
         translated_at=datetime.now().isoformat(),
         confidence="medium"  # Would be set by evaluation in production
     )
 
 
-def translate_collection(input_file: str, output_file: str, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514"):
+def _semantic_hit(ghazal: dict, cached: dict) -> TranslatedGhazal:
+    """Reuse a near-duplicate ghazal's translation for this ghazal."""
+    return TranslatedGhazal(**{
+        **cached,
+        "number": ghazal["number"],
+        "meter": ghazal["meter"],
+        "rhyme": ghazal["rhyme"],
+        "persian_text": ghazal["verses"],
+        "translated_at": datetime.now().isoformat(),
+        "confidence": "semantic-cache",
+    })
+
+
+async def _translate_all(ghazals: list, api_key: Optional[str], model: str,
+                         concurrency: int, writer: TranslationWriter,
+                         cache: Optional[AgentCache] = None,
+                         semantic_cache: Optional[SemanticCache] = None,
+                         batch_size: int = DEFAULT_BATCH_SIZE):
+    """
+    Translate ghazals with at most `concurrency` API calls in flight, writing each as it finishes.
+
+    Ghazals are scheduled `batch_size` at a time, so only one round of
+    tasks exists at once however large the collection is.
+    """
+    client = None
+    if api_key and not _HAS_ANTHROPIC:
+        print("Warning: anthropic package not installed. Using mock translation.")
+    elif api_key:
+        # Over HTTP/2 the concurrent requests share a few multiplexed
+        # connections, so the TLS handshake is paid once, not per request
+        http_client = anthropic.DefaultAsyncHttpxClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        )
+        client = anthropic.AsyncAnthropic(api_key=api_key, max_retries=LLM_MAX_RETRIES,
+                                          http_client=http_client)
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async def translate_one(ghazal: dict):
+        async with sem:
+            if semantic_cache is not None:
+                text = Ghazal.from_dict(ghazal).persian_text()
+                cached = semantic_cache.lookup(text)
+                if cached is not None:
+                    print(f"Ghazal #{ghazal['number']}: reusing a near-duplicate's translation (semantic cache)")
+                    writer.write(_semantic_hit(ghazal, cached))
+                    return
+            print(f"Translating Ghazal #{ghazal['number']}...")
+            try:
+                translated = await translate_ghazal_async(ghazal, client, model, cache)
+            except ValueError as e:
+                # An oversized prompt skips this ghazal, not the whole run
+                print(f"Skipping: {e}")
+                return
+            except _API_ERRORS as e:
+                # So does a request that still fails after retries
+                print(f"Error translating Ghazal #{ghazal['number']}: {e}")
+                return
+            if semantic_cache is not None and client is not None:
+                semantic_cache.add(text, translated.to_dict())
+            writer.write(translated)
+
+    try:
+        for start in range(0, len(ghazals), batch_size):
+            await asyncio.gather(*(translate_one(g) for g in ghazals[start:start + batch_size]))
+    finally:
+        if client is not None:
+            await client.close()
+
+
+def _translate_batch(ghazals: list, api_key: str, model: str, writer: TranslationWriter,
+                     cache: Optional[AgentCache] = None,
+                     semantic_cache: Optional[SemanticCache] = None):
+    """
+    Translate ghazals as one Message Batch, writing each as its result arrives.
+
+    Batches are billed at half the live rate but can take hours to finish,
+    so this blocks, polling every BATCH_POLL_INTERVAL seconds. Cached and
+    semantic-cache hits are answered locally and never submitted; ghazals
+    whose request fails are left out.
+    """
+    if not _HAS_ANTHROPIC:
+        print("Warning: anthropic package not installed. Using mock translation.")
+        for ghazal in ghazals:
+            writer.write(_build_translated_ghazal(ghazal, mock_translate(ghazal), "mock"))
+        return
+
+    client = _sync_client(api_key)
+
+    # custom_id is the ghazal's position, which is unique even if numbers repeat
+    keys = {}
+    texts = {}
+    requests = []
+    tokens = 0
+    for position, ghazal in enumerate(ghazals):
+        custom_id = str(position)
+        if semantic_cache is not None:
+            texts[custom_id] = Ghazal.from_dict(ghazal).persian_text()
+            cached = semantic_cache.lookup(texts[custom_id])
+            if cached is not None:
+                writer.write(_semantic_hit(ghazal, cached))
+                continue
+        user_prompt = format_ghazal_for_translation(ghazal)
+        keys[custom_id], cached = _cache_lookup(cache, model, user_prompt)
+        if cached is not None:
+            writer.write(_build_translated_ghazal(ghazal, cached, model))
+            continue
+        try:
+            tokens += _check_prompt_size(ghazal, user_prompt)
+        except ValueError as e:
+            print(f"Skipping: {e}")
+            continue
+        requests.append({
+            "custom_id": custom_id,
+            "params": {
+                "model": model,
+                "max_tokens": 2000,
+                "system": _SYSTEM_BLOCKS,
+                "messages": [{"role": "user", "content": user_prompt}]
+            }
+        })
+
+    print(f"{writer.count} ghazals cached, {len(requests)} to submit (~{tokens} input tokens)")
+    if requests:
+        batch = client.messages.batches.create(requests=requests)
+        print(f"Waiting on batch {batch.id}...")
+        while batch.processing_status != "ended":
+            time.sleep(BATCH_POLL_INTERVAL)
+            batch = client.messages.batches.retrieve(batch.id)
+
+        for entry in client.messages.batches.results(batch.id):
+            ghazal = ghazals[int(entry.custom_id)]
+            if entry.result.type != "succeeded":
+                print(f"Ghazal #{ghazal['number']}: batch request {entry.result.type}")
+                continue
+            response = _cache_store(cache, keys[entry.custom_id], entry.result.message.content[0].text)
+            translated = _build_translated_ghazal(ghazal, response, model)
+            if semantic_cache is not None:
+                semantic_cache.add(texts[entry.custom_id], translated.to_dict())
+            writer.write(translated)
+
+
+def translate_collection(input_file: str, output_file: str, api_key: Optional[str] = None, model: str = "claude-sonnet-4-20250514",
+                         concurrency: int = DEFAULT_CONCURRENCY, use_cache: bool = True,
+                         cache_path: Optional[str] = None, semantic_cache: bool = False,
+                         batch: bool = False, batch_size: int = DEFAULT_BATCH_SIZE,
+                         resume: bool = False):
     """
     Translate all ghazals in a collection file.
+
+    Up to `concurrency` ghazals are translated at once, in rounds of
+    `batch_size`, overlapping the waits on the API. API responses are
+    cached in cache_path (default: $DIVAN_CACHE, else .agent_cache.sqlite)
+    unless use_cache is False.
+    With semantic_cache, a ghazal whose verses are near-identical to an
+    already translated one reuses that translation instead of calling the API.
+    With batch, all API calls go out as one Message Batch instead.
+
+    Translations are streamed to a JSON Lines file as they finish. If
+    output_file is not itself .jsonl, that file is written alongside it and
+    wrapped into the usual single-object format once the run completes.
+    With resume, ghazals already in that file, or in output_file from a
+    finished run, are kept and not translated again.
+    """
+    with open(input_file, 'rb') as f:
+        data = orjson.loads(f.read())
+
+    jsonl_file = output_file if output_file.endswith(".jsonl") else output_file + ".jsonl"
+    done = _load_done(jsonl_file, output_file) if resume else []
+    done_numbers = {t["number"] for t in done}
+    ghazals = [g for g in data["ghazals"] if g["number"] not in done_numbers]
+    if resume:
+        print(f"Resuming: {len(done)} ghazals already translated, {len(ghazals)} to go")
+
+    cache = AgentCache(cache_path) if use_cache and api_key else None
+    semantic = SemanticCache(TRANSLATION_SEMANTIC_CACHE_DIR) if semantic_cache and api_key else None
+    if semantic is not None:
+        # Embed every ghazal in batched encode calls rather than one per lookup
+        semantic.prime([Ghazal.from_dict(g).persian_text() for g in ghazals])
+
+    writer = TranslationWriter(jsonl_file)
+    try:
+        # Rewritten rather than appended to, which drops a line cut short by a crash
+        for translated in done:
+            writer.write(translated)
+        if batch and api_key:
+            _translate_batch(ghazals, api_key, model, writer, cache, semantic)
+        else:
+            asyncio.run(_translate_all(ghazals, api_key, model, concurrency, writer, cache, semantic,
+                                       batch_size))
+    finally:
+        writer.close()
+
+    if semantic is not None:
+        semantic.save()
+
+    if jsonl_file == output_file:
+        print(f"Translations saved to {output_file}")
+        return None
+
+    output = jsonl_to_wrapped(jsonl_file, data, output_file, model if api_key else "mock")
+    os.remove(jsonl_file)
+    return output
+
+
+def _load_done(jsonl_file: str, output_file: str) -> list:
+    """Translations written by an earlier run: its JSON Lines stream, else its wrapped output."""
+    if os.path.exists(jsonl_file):
+        done = []
+        with open(jsonl_file, 'rb') as f:
+            for line in f:
+                try:
+                    done.append(orjson.loads(line))
+                except orjson.JSONDecodeError:
+                    # Blank, or the last line of a run that died mid-write
+                    continue
+        return done
+    if os.path.exists(output_file):
+        with open(output_file, 'rb') as f:
+            return orjson.loads(f.read()).get("translations", [])
+    return []
+
+
+def jsonl_to_wrapped(jsonl_file: str, data: dict, output_file: str, model: str) -> dict:
+    """
+    Wrap a JSON Lines file of translations in the collection metadata.
+
+    Lines are in completion order; they are put back in the collection's order.
     """
-    with open(input_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    with open(jsonl_file, 'rb') as f:
+        translations = [orjson.loads(line) for line in f if line.strip()]
 
-    translations = []
-    for ghazal in data["ghazals"]:
-        print(f"Translating Ghazal #{ghazal['number']}...")
-        translated = translate_ghazal(ghazal, api_key, model)
-        translations.append(translated.to_dict())
+    position = {}
+    for i, ghazal in enumerate(data["ghazals"]):
+        position.setdefault(ghazal["number"], i)
+    translations.sort(key=lambda t: position.get(t["number"], len(position)))
 
     output = {
         "source": data["source"],
         "edition": data["edition"],
         "translation_method": "LLM (Omid Safi approach)",
         "translated_at": datetime.now().isoformat(),
-        "model": model if api_key else "mock",
+        "model": model,
         "translations": translations
     }
 
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+    # orjson writes UTF-8 bytes directly (no ASCII escaping of Persian text)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(output, option=orjson.OPT_INDENT_2))
 
     print(f"Translations saved to {output_file}")
     return output
@@ -272,12 +665,28 @@ def main():
     parser.add_argument("--output", "-o", default="translations.json", help="Output JSON file for translations")
     parser.add_argument("--api-key", help="Anthropic API key (uses mock if not provided)")
     parser.add_argument("--model", default="claude-sonnet-4-20250514", help="Model to use for translation")
+    parser.add_argument("--concurrency", "-j", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Maximum ghazals translated at once")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Ghazals scheduled per round of concurrent translation")
+    parser.add_argument("--resume", action="store_true",
+                        help="Keep ghazals already in the output and translate only the rest")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Call the API for every ghazal, ignoring cached responses")
+    parser.add_argument("--cache-path",
+                        help="API response cache (default: $DIVAN_CACHE or .agent_cache.sqlite)")
+    parser.add_argument("--semantic-cache", action="store_true",
+                        help="Reuse translations of near-duplicate ghazals (needs sentence-transformers, faiss-cpu)")
+    parser.add_argument("--batch", action="store_true",
+                        help="Submit all ghazals as one Message Batch (half price, may take hours)")
 
     args = parser.parse_args()
 
     api_key = args.api_key or os.environ.get("ANTHROPIC_API_KEY")
 
-    translate_collection(args.input, args.output, api_key, args.model)
+    translate_collection(args.input, args.output, api_key, args.model, args.concurrency,
+                         not args.no_cache, args.cache_path, args.semantic_cache,
+                         args.batch, args.batch_size, args.resume)
 
 
 if __name__ == "__main__":
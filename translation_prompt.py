@@ -3,6 +3,8 @@ Translation prompt design for Divan-e Kabir
 Informed by Omid Safi's approach to Rumi translation
 """
 
+import re
+
 SYSTEM_PROMPT = """You are a scholarly translator of classical Persian Sufi poetry, specializing in the works of Jalal al-Din Rumi (Mawlana). Your translations follow the approach of contemporary scholar Omid Safi, which emphasizes:
 
 ## Core Principles
@@ -84,21 +86,18 @@ Provide:
 
 Remember: Preserve the Islamic and Sufi context. Do not universalize or secularize."""
 
+# The template's constant text around its four fields, split once at import
+# so formatting a ghazal is plain concatenation with no placeholder parsing
+_P1, _P2, _P3, _P4, _P5 = re.split(r"\{(?:ghazal_number|meter|rhyme|persian_text)\}",
+                                   TRANSLATION_USER_PROMPT)
+
 
 def format_ghazal_for_translation(ghazal: dict) -> str:
     """Format a ghazal dict into the prompt format."""
-    persian_lines = []
-    for verse in ghazal["verses"]:
-        persian_lines.append(f"{verse['hemistich1']} / {verse['hemistich2']}")
-
-    persian_text = "\n".join(persian_lines)
-
-    return TRANSLATION_USER_PROMPT.format(
-        ghazal_number=ghazal["number"],
-        meter=ghazal["meter"],
-        rhyme=ghazal["rhyme"],
-        persian_text=persian_text
-    )
+    # str.join builds a list from a generator anyway, so a comprehension is faster
+    persian_text = "\n".join([f"{v['hemistich1']} / {v['hemistich2']}" for v in ghazal["verses"]])
+
+    return f"{_P1}{ghazal['number']}{_P2}{ghazal['meter']}{_P3}{ghazal['rhyme']}{_P4}{persian_text}{_P5}"
 
 
 if __name__ == "__main__":